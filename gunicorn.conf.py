@@ -0,0 +1,23 @@
+# gunicorn.conf.py - Production server configuration
+"""
+Gunicorn Configuration for Recipe Recommender
+=============================================
+Cooperative gevent workers for the I/O-bound workload (Gemini API calls
+and SQLite access), so waiting requests yield instead of pinning threads.
+
+Usage:
+    gunicorn -c gunicorn.conf.py recipe_recommender.backend.app:app
+"""
+
+# No monkey.patch_all() here: this file is loaded by the arbiter (master), which
+# must stay unpatched; the gevent worker class patches each worker itself
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = 'gevent'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', '1000'))
+keepalive = 5
+accesslog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'INFO').lower()
@@ -10,19 +10,36 @@ Version: 1.0.0
 License: MIT
 """
 
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_caching import Cache
+from flask_compress import Compress
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from jinja2 import FileSystemBytecodeCache
 import os
+import atexit
 import logging
+import logging.handlers
+import queue
 from datetime import datetime, timedelta
 import sqlite3
 from contextlib import contextmanager
-import json
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import threading
+import time
+import hashlib
+import brotli
+import orjson
+import re
+import tempfile
 
 # Import custom modules
-from recipe_recommender.backend.config import Config
-from recipe_recommender.backend.database import init_db, get_db_connection
+from recipe_recommender.backend.config import RESOLVED, SECURITY_HEADER_ITEMS
+from recipe_recommender.backend.database import (
+    init_db, get_read_connection, load_sudanese_recipes, load_common_ingredients, HEALTH_CHECK_SQL
+)
 from recipe_recommender.backend.services.ai_service import AIRecipeService
 from recipe_recommender.backend.services.recipe_service import RecipeService
 from recipe_recommender.backend.services.pantry_service import PantryService
@@ -30,17 +47,57 @@ from recipe_recommender.backend.routes.api_routes import api_bp
 from recipe_recommender.backend.routes.pantry_routes import pantry_bp
 
 
-# Configure logging for production readiness
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
+# Configure logging for production readiness: request threads only enqueue
+# records, a background listener formats them and does the file/console I/O
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+file_handler = logging.FileHandler('app.log')
+file_handler.setFormatter(log_formatter)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+log_listener = logging.handlers.QueueListener(
+    log_queue, file_handler, stream_handler, respect_handler_level=True
 )
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
+# Characters stripped from submitted ingredient names (keeps letters, digits, spaces, hyphens)
+_INGREDIENT_NOISE = re.compile(r'[^\w \-]+')
+
+# Pre-rendered landing page written at startup; kept in the temp dir (like the
+# Jinja bytecode cache) so the source tree can stay read-only
+RENDERED_INDEX = '_index_rendered.html'
+RENDERED_DIR = os.path.join(tempfile.gettempdir(), 'recipe_recommender')
+
+# Refresh interval for the materialized popular-ingredients payload
+POPULAR_REFRESH_SECONDS = 60
+
+# Minimum interval between /health database probes, and the cached healthy body
+HEALTH_PROBE_SECONDS = 5
+
+# Longest a search waits on Gemini before answering with database results only
+AI_SUGGESTIONS_WAIT_SECONDS = 15
+# Coalesced searches wait out the leader's AI wait plus database and ranking time,
+# then compute the result themselves rather than failing
+SEARCH_LEADER_WAIT_SECONDS = AI_SUGGESTIONS_WAIT_SECONDS + 15
+HEALTHY_BODY = orjson.dumps({'status': 'healthy', 'version': '1.0.0', 'database': 'connected'})
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson (faster encoding, native datetime support)"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 def create_app():
     """
     Application factory pattern for better testability and configuration management.
@@ -52,23 +109,65 @@ def create_app():
                 template_folder='templates',
                 static_folder='static')
     
-    # Load configuration from environment variables
-    app.config.from_object(Config)
+    app.json = ORJSONProvider(app)
+    
+    # Load configuration resolved from environment variables
+    app.config.update(RESOLVED)
+    max_ingredients = app.config['MAX_INGREDIENTS_PER_SEARCH']
     
     # Initialize extensions
     CORS(app, resources={r"/api/*": {"origins": "*"}})
     
-    # Initialize caching for performance optimization
-    cache = Cache(app, config={'CACHE_TYPE': 'simple'})
+    # Initialize caching for performance optimization (Redis when REDIS_URL is set, else in-process)
+    cache = Cache(app, config={
+        'CACHE_TYPE': app.config['CACHE_TYPE'],
+        'CACHE_REDIS_URL': app.config['CACHE_REDIS_URL'],
+        'CACHE_KEY_PREFIX': app.config['CACHE_KEY_PREFIX'],
+        'CACHE_DEFAULT_TIMEOUT': app.config['CACHE_DEFAULT_TIMEOUT']
+    })
     app.cache = cache
     
+    # Compress JSON/HTML responses (Brotli preferred, gzip fallback)
+    Compress(app)
+    
+    # Rate limiting backed by the shared Redis instance when configured; if the
+    # storage goes down, limits fall back to in-memory counters instead of failing requests
+    limiter = Limiter(
+        get_remote_address,
+        app=app,
+        storage_uri=app.config['RATELIMIT_STORAGE_URL'],
+        default_limits=[f"{app.config['RATELIMIT_PER_HOUR']}/hour"],
+        in_memory_fallback_enabled=True,
+        swallow_errors=True
+    )
+    
     # Initialize database
     with app.app_context():
         init_db()
         logger.info("Database initialized successfully")
     
+    # Warm the cached seed data so the first request doesn't pay for the read
+    load_sudanese_recipes()
+    load_common_ingredients()
+    
+    # Worker pool for running independent lookups concurrently
+    app.executor = ThreadPoolExecutor(max_workers=8)
+    
     # Initialize services
-    app.ai_service = AIRecipeService(app.config['GEMINI_API_KEY'])
+    app.ai_service = AIRecipeService(
+        app.config['GEMINI_API_KEY'],
+        model=app.config['GEMINI_MODEL'],
+        timeout=app.config['GEMINI_TIMEOUT'],
+        l2_cache=cache,
+        l2_timeout=app.config['AI_CACHE_TIMEOUT'],
+        max_concurrency=app.config['GEMINI_MAX_CONCURRENCY'],
+        rate_limit_per_minute=app.config['GEMINI_RATE_LIMIT_PER_MINUTE'],
+        rate_limiter=app.config['GEMINI_RATE_LIMITER'],
+        cache_size=app.config['AI_CACHE_SIZE'],
+        batch_window=app.config['GEMINI_BATCH_WINDOW_MS'] / 1000,
+        batch_max=app.config['GEMINI_BATCH_MAX']
+    )
+    atexit.register(app.ai_service.close)
     app.recipe_service = RecipeService()
     app.pantry_service = PantryService()
     
@@ -76,6 +175,14 @@ def create_app():
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(pantry_bp, url_prefix='/api/pantry')
     
+    # Security headers on every response, from the pre-built (name, value) pairs
+    @app.after_request
+    def apply_security_headers(response):
+        headers = response.headers
+        for name, value in SECURITY_HEADER_ITEMS:
+            headers[name] = value
+        return response
+    
     # Error handlers for fault tolerance
     @app.errorhandler(400)
     def bad_request(error):
@@ -91,7 +198,7 @@ def create_app():
     
     @app.errorhandler(429)
     def rate_limit_exceeded(error):
-        """Handle rate limiting for OpenAI API"""
+        """Handle rate limiting (Flask-Limiter and Gemini API)"""
         logger.warning(f"Rate limit exceeded: {error}")
         return jsonify({
             'error': 'API rate limit exceeded. Please try again in a moment.',
@@ -99,45 +206,152 @@ def create_app():
             'retry_after': 60
         }), 429
     
-    # Health check endpoint for monitoring
+    # Health check endpoint for monitoring: the database probe runs at most
+    # every HEALTH_PROBE_SECONDS, other hits return the pre-encoded status
+    health_state = {'checked_at': float('-inf'), 'ok': True, 'body': HEALTHY_BODY}
+    health_lock = threading.Lock()
+    
     @app.route('/health')
+    @limiter.exempt
     def health_check():
         """Health check endpoint for deployment monitoring"""
-        try:
-            # Test database connection
-            with get_db_connection() as conn:
-                conn.execute('SELECT 1').fetchone()
-            
-            return jsonify({
-                'status': 'healthy',
-                'timestamp': datetime.utcnow().isoformat(),
-                'version': '1.0.0',
-                'database': 'connected'
-            })
-        except Exception as e:
-            logger.error(f"Health check failed: {e}")
-            return jsonify({
-                'status': 'unhealthy',
-                'error': str(e)
-            }), 503
+        now = time.monotonic()
+        if now - health_state['checked_at'] > HEALTH_PROBE_SECONDS:
+            with health_lock:
+                if now - health_state['checked_at'] > HEALTH_PROBE_SECONDS:
+                    try:
+                        # Test database connection
+                        with get_read_connection() as conn:
+                            conn.execute(HEALTH_CHECK_SQL).fetchone()
+                        health_state.update(checked_at=now, ok=True, body=HEALTHY_BODY)
+                    except Exception as e:
+                        logger.error(f"Health check failed: {e}")
+                        health_state.update(checked_at=now, ok=False, body=orjson.dumps({
+                            'status': 'unhealthy',
+                            'error': str(e)
+                        }))
+        
+        return Response(health_state['body'], status=200 if health_state['ok'] else 503,
+                        content_type='application/json')
+    
+    # Compile templates once: bytecode cache survives restarts, and the
+    # landing page has no per-request state so it is rendered to a static file
+    if not app.debug:
+        app.jinja_env.auto_reload = False
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+    with app.test_request_context('/'):
+        index_html = render_template('index.html')
+    # Write-then-rename: workers booting concurrently each replace the file
+    # atomically, so the page is never served half-written
+    os.makedirs(RENDERED_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=RENDERED_DIR, prefix=RENDERED_INDEX, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(index_html)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, os.path.join(RENDERED_DIR, RENDERED_INDEX))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
     
     # Main route serving the frontend
     @app.route('/')
     def index():
         """Serve the main application page"""
         try:
-            # Add tags for stylesheet and script injection
-            extra_head = """
-<link rel="stylesheet" href="{{ url_for('static', filename='style.css') }}">
-<script src="{{ url_for('static', filename='script.js') }}"></script>
-"""
-            return render_template('index.html')
+            if app.debug:
+                # Pick up template edits during development
+                return render_template('index.html')
+            response = send_from_directory(RENDERED_DIR, RENDERED_INDEX, max_age=3600)
+            response.headers['Cache-Control'] = 'public, max-age=3600, immutable'
+            return response
         except Exception as e:
             logger.error(f"Error serving index page: {e}")
             return f"Application error: {e}", 500
     
+    # Searches currently being computed, keyed by cache key (request coalescing)
+    inflight_searches = {}
+    inflight_lock = threading.Lock()
+    
+    def cache_get(key):
+        """Search cache lookup; a cache outage counts as a miss"""
+        try:
+            return app.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Search cache lookup failed: {e}")
+            return None
+    
+    def cache_search_result(cache_key, result):
+        """Cache results for 30 minutes, plus a Brotli copy so hits skip encode + compress"""
+        try:
+            app.cache.set(cache_key, result, timeout=1800)
+            app.cache.set(
+                cache_key + ':br',
+                brotli.compress(orjson.dumps(result), quality=app.config['COMPRESS_BR_LEVEL']),
+                timeout=1800
+            )
+        except Exception as e:
+            logger.warning(f"Search cache write failed: {e}")
+    
+    def run_search(ingredients, cuisine_preference, dietary_restrictions, difficulty, max_cook_time):
+        """Compute a recipe search result (AI + database, combined and ranked)"""
+        # Run the AI request in the pool while the database lookup runs here;
+        # the SQLite query never queues behind Gemini calls occupying the workers
+        ai_future = app.executor.submit(
+            app.ai_service.get_recipe_suggestions_coalesced,
+            ingredients=ingredients,
+            cuisine_preference=cuisine_preference,
+            dietary_restrictions=dietary_restrictions,
+            difficulty=difficulty
+        )
+        
+        # Get database recipes matching ingredients
+        db_recipes = app.recipe_service.find_matching_recipes(
+            ingredients=ingredients,
+            cuisine_type=cuisine_preference if cuisine_preference != 'any' else None,
+            max_cook_time=max_cook_time,
+            difficulty=difficulty
+        )
+        
+        # Get AI-powered recipe suggestions; a slow Gemini call still returns DB results
+        try:
+            ai_suggestions = ai_future.result(timeout=AI_SUGGESTIONS_WAIT_SECONDS)
+        except FuturesTimeoutError:
+            logger.warning(f"AI suggestions timed out for ingredients: {ingredients}")
+            ai_suggestions = []
+        except Exception as e:
+            logger.error(f"AI suggestions failed for ingredients {ingredients}: {e}")
+            ai_suggestions = []
+        
+        # Combine results, then select only the top recipes for the response
+        scored_recipes = app.recipe_service.score_recipes(ai_suggestions, db_recipes, ingredients)
+        total_found = len(scored_recipes)
+        top_recipes = app.recipe_service.rank_recipes(
+            scored_recipes, limit=app.config['MAX_RECIPES_PER_RESPONSE']
+        )
+        
+        # Log the search for analytics
+        app.recipe_service.log_search(ingredients, total_found)
+        
+        result = {
+            'recipes': top_recipes,
+            'total_found': total_found,
+            'search_meta': {
+                'ingredients_used': ingredients,
+                'cuisine_preference': cuisine_preference,
+                'difficulty': difficulty,
+                'timestamp': datetime.utcnow()
+            }
+        }
+        
+        return result
+    
     # Recipe search endpoint with caching
     @app.route('/api/recipes/search', methods=['POST'])
+    @limiter.limit(
+        app.config['RATELIMIT_SEARCH'],
+        key_func=lambda: request.headers.get('X-Api-Key') or get_remote_address()
+    )
     def search_recipes():
         """
         Main recipe search endpoint with AI integration
@@ -158,61 +372,90 @@ def create_app():
             if not data or 'ingredients' not in data:
                 return jsonify({'error': 'Ingredients list is required'}), 400
             
-            ingredients = [ingredient.strip().lower() for ingredient in data.get('ingredients', [])]
+            # Normalize, dedupe and sort in one pass; sorted order keeps the cache key canonical
+            raw_ingredients = data.get('ingredients') or []
+            ingredients = sorted({
+                _INGREDIENT_NOISE.sub('', item.strip().lower())
+                for item in raw_ingredients
+                if isinstance(item, str) and item.strip()
+            } - {''})[:max_ingredients]
             if not ingredients:
                 return jsonify({'error': 'At least one ingredient is required'}), 400
             
             cuisine_preference = data.get('cuisine_preference', 'any')
-            dietary_restrictions = data.get('dietary_restrictions', [])
-            difficulty = min(max(data.get('difficulty', 3), 1), 5)
-            max_cook_time = data.get('max_cook_time', 60)
+            if not isinstance(cuisine_preference, str):
+                raise ValueError('cuisine_preference must be a string')
+            cuisine_preference = cuisine_preference.strip() or 'any'
+            # Canonical restrictions (stripped, lowercased, deduped, sorted) for the cache key
+            dietary_restrictions = data.get('dietary_restrictions') or []
+            if not isinstance(dietary_restrictions, list) or not all(isinstance(item, str) for item in dietary_restrictions):
+                raise ValueError('dietary_restrictions must be a list of strings')
+            dietary_restrictions = sorted({item.strip().lower() for item in dietary_restrictions} - {''})
+            # Numeric filters are bound straight into SQL, where a string would compare as text
+            try:
+                difficulty = min(max(int(data.get('difficulty', 3)), 1), 5)
+                max_cook_time = data.get('max_cook_time', 60)
+                max_cook_time = int(max_cook_time) if max_cook_time is not None else None
+            except (TypeError, ValueError):
+                raise ValueError('difficulty and max_cook_time must be integers')
+            
+            # Create a deterministic cache key (stable across workers and restarts)
+            payload = orjson.dumps({
+                'i': ingredients,
+                'c': cuisine_preference,
+                'd': difficulty,
+                't': max_cook_time,
+                'r': dietary_restrictions
+            })
+            cache_key = 'search:' + hashlib.blake2b(payload, digest_size=16).hexdigest()
             
-            # Create cache key for performance optimization
-            cache_key = f"recipes_{hash(str(sorted(ingredients)))}_{cuisine_preference}_{difficulty}_{max_cook_time}"
+            # Serve the pre-compressed cached body when the client accepts Brotli
+            if 'br' in request.accept_encodings:
+                compressed_result = cache_get(cache_key + ':br')
+                if compressed_result:
+                    logger.info(f"Serving pre-compressed cached results for ingredients: {ingredients}")
+                    return Response(compressed_result, content_type='application/json', headers={
+                        'Content-Encoding': 'br',
+                        'Vary': 'Accept-Encoding'
+                    })
             
             # Try to get cached results first
-            cached_result = app.cache.get(cache_key)
+            cached_result = cache_get(cache_key)
             if cached_result:
                 logger.info(f"Serving cached results for ingredients: {ingredients}")
                 return jsonify(cached_result)
             
-            # Get AI-powered recipe suggestions
-            ai_suggestions = app.ai_service.get_recipe_suggestions(
-                ingredients=ingredients,
-                cuisine_preference=cuisine_preference,
-                dietary_restrictions=dietary_restrictions,
-                difficulty=difficulty
-            )
-            
-            # Get database recipes matching ingredients
-            db_recipes = app.recipe_service.find_matching_recipes(
-                ingredients=ingredients,
-                cuisine_type=cuisine_preference if cuisine_preference != 'any' else None,
-                max_cook_time=max_cook_time,
-                difficulty=difficulty
-            )
+            # Coalesce concurrent identical searches: the first request computes,
+            # the rest wait on its future instead of calling Gemini again
+            with inflight_lock:
+                future = inflight_searches.get(cache_key)
+                is_leader = future is None
+                if is_leader:
+                    future = Future()
+                    inflight_searches[cache_key] = future
             
-            # Combine and rank results
-            combined_recipes = app.recipe_service.combine_and_rank_recipes(
-                ai_suggestions, db_recipes, ingredients
-            )
+            if not is_leader:
+                logger.info(f"Waiting on in-flight search for ingredients: {ingredients}")
+                try:
+                    return jsonify(future.result(timeout=SEARCH_LEADER_WAIT_SECONDS))
+                except FuturesTimeoutError:
+                    logger.warning(f"In-flight search timed out, searching directly for ingredients: {ingredients}")
+                    return jsonify(run_search(
+                        ingredients, cuisine_preference, dietary_restrictions, difficulty, max_cook_time
+                    ))
             
-            # Log the search for analytics
-            app.recipe_service.log_search(ingredients, len(combined_recipes))
-            
-            result = {
-                'recipes': combined_recipes[:10],  # Limit to top 10 results
-                'total_found': len(combined_recipes),
-                'search_meta': {
-                    'ingredients_used': ingredients,
-                    'cuisine_preference': cuisine_preference,
-                    'difficulty': difficulty,
-                    'timestamp': datetime.utcnow().isoformat()
-                }
-            }
-            
-            # Cache results for 30 minutes
-            app.cache.set(cache_key, result, timeout=1800)
+            try:
+                result = run_search(
+                    ingredients, cuisine_preference, dietary_restrictions, difficulty, max_cook_time
+                )
+                cache_search_result(cache_key, result)
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with inflight_lock:
+                    inflight_searches.pop(cache_key, None)
             
             return jsonify(result)
             
@@ -223,15 +466,41 @@ def create_app():
             logger.error(f"Error in recipe search: {e}")
             return jsonify({'error': 'Recipe search failed. Please try again.'}), 500
     
+    # Popular ingredients are materialized in the background (refreshed every
+    # POPULAR_REFRESH_SECONDS) so the analytics endpoint never touches SQLite
+    popular_ingredients = {'body': None}
+    popular_lock = threading.Lock()
+    
+    def refresh_popular_ingredients():
+        """Recompute the serialized popular-ingredients payload"""
+        body = orjson.dumps({
+            'popular_ingredients': app.recipe_service.get_popular_ingredients(limit=20),
+            'generated_at': datetime.utcnow()
+        })
+        with popular_lock:
+            popular_ingredients['body'] = body
+    
+    def popular_ingredients_refresher():
+        """Background loop keeping the popular-ingredients payload fresh"""
+        while True:
+            time.sleep(POPULAR_REFRESH_SECONDS)
+            try:
+                refresh_popular_ingredients()
+            except Exception as e:
+                logger.error(f"Error refreshing popular ingredients: {e}")
+    
+    refresh_popular_ingredients()
+    threading.Thread(target=popular_ingredients_refresher, name='popular-ingredients', daemon=True).start()
+    
     # Get recipe analytics endpoint
     @app.route('/api/analytics/popular-ingredients')
     def get_popular_ingredients():
-        """Get most popular ingredients from search logs"""
+        """Get most popular ingredients from search logs (materialized view)"""
         try:
-            popular_ingredients = app.recipe_service.get_popular_ingredients(limit=20)
-            return jsonify({
-                'popular_ingredients': popular_ingredients,
-                'generated_at': datetime.utcnow().isoformat()
+            with popular_lock:
+                body = popular_ingredients['body']
+            return Response(body, content_type='application/json', headers={
+                'Cache-Control': f'public, max-age={POPULAR_REFRESH_SECONDS}'
             })
         except Exception as e:
             logger.error(f"Error getting popular ingredients: {e}")
@@ -245,17 +514,5 @@ def create_app():
 # Application instance
 app = create_app()
 
-if __name__ == '__main__':
-    # Development server configuration
-    port = int(os.environ.get('PORT', 5000))
-    debug = os.environ.get('FLASK_ENV') == 'development'
-    
-    logger.info(f"Starting Recipe Recommender on port {port}")
-    logger.info(f"Debug mode: {debug}")
-    
-    app.run(
-        host='0.0.0.0',
-        port=port,
-        debug=debug,
-        threaded=True  # Enable threading for better performance
-    )
\ No newline at end of file
+# Production: gunicorn -c gunicorn.conf.py recipe_recommender.backend.app:app
+# (gevent workers, see Procfile). Use run.py for local development.
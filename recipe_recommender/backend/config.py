@@ -14,6 +14,7 @@ Security Features:
 
 import os
 from datetime import timedelta
+from types import MappingProxyType
 
 class Config:
     """
@@ -35,14 +36,34 @@ class Config:
     # Gemini API Configuration (Google Generative AI)
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
     GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-2.0-flash')
-    
-    # Rate Limiting Configuration
-    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
+    GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', '15'))
+    GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', '15'))  # In-flight calls for batched requests
+    GEMINI_RATE_LIMIT_PER_MINUTE = int(os.environ.get('GEMINI_RATE_LIMIT_PER_MINUTE', '15'))
+    GEMINI_RATE_LIMITER = os.environ.get('GEMINI_RATE_LIMITER', 'bucket')  # 'bucket' or 'window' (strict per-minute)
+    GEMINI_BATCH_WINDOW_MS = int(os.environ.get('GEMINI_BATCH_WINDOW_MS', '0'))  # Coalesce concurrent searches (0 = off)
+    GEMINI_BATCH_MAX = int(os.environ.get('GEMINI_BATCH_MAX', '16'))
+    
+    # Redis instance shared by the search cache and the rate limiter (unset: both stay in-process)
+    REDIS_URL = os.environ.get('REDIS_URL')
+    
+    # Rate Limiting Configuration (Flask-Limiter)
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', REDIS_URL or 'memory://')
     RATELIMIT_PER_HOUR = int(os.environ.get('RATELIMIT_PER_HOUR', '100'))
-    
-    # Cache Configuration
-    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'simple')
-    CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT', '300'))
+    RATELIMIT_SEARCH = os.environ.get('RATELIMIT_SEARCH', '30/minute;500/day')
+    
+    # Cache Configuration - Redis keeps search results shared across workers when configured
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'RedisCache' if REDIS_URL else 'SimpleCache')
+    CACHE_REDIS_URL = REDIS_URL
+    CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'recipes:')
+    CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT', '1800'))
+    AI_CACHE_TIMEOUT = int(os.environ.get('AI_CACHE_TIMEOUT', '604800'))  # Gemini responses kept 7 days
+    AI_CACHE_SIZE = int(os.environ.get('AI_CACHE_SIZE', '100'))  # In-process LRU entries per worker
+    
+    # Response Compression (Flask-Compress)
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    COMPRESS_LEVEL = 5  # gzip level
+    COMPRESS_BR_LEVEL = 5  # Brotli quality
+    COMPRESS_MIN_SIZE = 1024
     
     # Session Configuration
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
@@ -74,7 +95,8 @@ class Config:
         'Content-Security-Policy': (
             "default-src 'self'; "
             "script-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com; "
-            "style-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com; "
+            "style-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com https://fonts.googleapis.com; "
+            "font-src 'self' https://fonts.gstatic.com; "
             "img-src 'self' data: https:; "
             "connect-src 'self' https://api.openai.com"
         )
@@ -108,6 +130,7 @@ class Config:
             'check_same_thread': False,  # Allow SQLite to be used across threads
             'timeout': 20.0,  # Connection timeout
             'isolation_level': None,  # Autocommit mode
+            'cached_statements': 256,  # Per-connection compiled statement cache
         }
     
     @staticmethod
@@ -120,8 +143,20 @@ class Config:
         return {
             'api_key': Config.GEMINI_API_KEY,
             'model': Config.GEMINI_MODEL,
+            'timeout': Config.GEMINI_TIMEOUT,
+            'max_concurrency': Config.GEMINI_MAX_CONCURRENCY,
+            'rate_limit_per_minute': Config.GEMINI_RATE_LIMIT_PER_MINUTE,
+            'rate_limiter': Config.GEMINI_RATE_LIMITER,
+            'batch_window': Config.GEMINI_BATCH_WINDOW_MS / 1000,
+            'batch_max': Config.GEMINI_BATCH_MAX,
         }
 
+# Resolved configuration, read from the environment once at import time
+RESOLVED = MappingProxyType({key: getattr(Config, key) for key in dir(Config) if key.isupper()})
+
+# Security headers as pre-built (name, value) pairs for response hooks
+SECURITY_HEADER_ITEMS = tuple(Config.SECURITY_HEADERS.items())
+
 class DevelopmentConfig(Config):
     """Development-specific configuration"""
     DEBUG = True
@@ -14,57 +14,319 @@ Features:
 
 import sqlite3
 import os
-import json
 import logging
+import queue
+import mmap
+import functools
+import atexit
+import time
+from collections import Counter
 from contextlib import contextmanager
 from datetime import datetime
-from threading import Lock
+from threading import Lock, Thread
+from types import MappingProxyType
+import orjson
 from .config import Config
+from .models.recipe import Recipe, RECIPE_COLUMNS, SEARCH_COLUMNS, LIST_SEPARATOR
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Thread-safe database connection lock
-db_lock = Lock()
+
+# Hot query text, kept as fixed strings (only ? placeholders) so each pooled
+# connection's statement cache reuses the compiled statement
+# List columns are read from the normalized recipe_ingredients/recipe_tags
+# tables as LIST_SEPARATOR (char(31)) joined strings, so rows skip json.loads;
+# the ordered subqueries keep each list in its stored (JSON array) order
+_LIST_COLUMN_SQL = {
+    'ingredients': (
+        "(SELECT group_concat(name, char(31)) FROM (SELECT name FROM recipe_ingredients "
+        "WHERE recipe_id = r.id ORDER BY position)) AS ingredients"
+    ),
+    'dietary_tags': (
+        "(SELECT group_concat(tag, char(31)) FROM (SELECT tag FROM recipe_tags "
+        "WHERE recipe_id = r.id ORDER BY position)) AS dietary_tags"
+    ),
+}
+
+# Recipe queries select RECIPE_COLUMNS explicitly so rows unpack positionally
+_RECIPE_SELECT = ', '.join(_LIST_COLUMN_SQL.get(column, f'r.{column}') for column in RECIPE_COLUMNS)
+
+# Search results feed list cards and ranking only; instructions (often
+# kilobytes) are left to the detail fetch
+_SEARCH_SELECT = ', '.join(_LIST_COLUMN_SQL.get(column, f'r.{column}') for column in SEARCH_COLUMNS)
+
+RECIPE_BY_ID_SQL = f'''
+    SELECT {_RECIPE_SELECT}
+    FROM recipes r
+    WHERE r.id = ?
+'''
+
+# Mutable columns of a recipe row: a cheap primary-key probe that tells every
+# worker process whether its cached Recipe is still current (updated_at alone
+# has one-second resolution)
+RECIPE_VERSION_SQL = 'SELECT updated_at, popularity_score, avg_rating, rating_count FROM recipes WHERE id = ?'
+
+# bm25-ranked FTS hits are limited first, then joined to recipes; rating
+# aggregates come from the trigger-maintained columns on recipes
+SEARCH_BY_INGREDIENTS_SQL = f'''
+    WITH hits AS (
+        SELECT rowid, bm25(recipes_fts) AS score
+        FROM recipes_fts
+        WHERE recipes_fts MATCH ?
+        ORDER BY score
+        LIMIT ?
+    )
+    SELECT {_SEARCH_SELECT}
+    FROM hits
+    JOIN recipes r ON r.id = hits.rowid
+    ORDER BY hits.score, r.popularity_score DESC
+'''
+
+# Filtered variants: cuisine/difficulty/cook-time are applied before the LIMIT,
+# so filtered searches still fill the page. One fixed statement per combination
+# of active filters (no "IS NULL OR" guards) lets the planner seek
+# idx_recipes_filters instead of testing every FTS hit.
+_SEARCH_FILTER_CLAUSES = (
+    ('cuisine_type', 'r.cuisine_type = :cuisine_type'),
+    ('difficulty', 'r.difficulty_level = :difficulty'),
+    ('max_cook_time', 'coalesce(r.cook_time_minutes, 99) <= :max_cook_time'),
+)
+
+def _filtered_search_sql(active):
+    """Filtered search statement for the given active filter names"""
+    where = ''.join(f'\n          AND {clause}' for name, clause in _SEARCH_FILTER_CLAUSES if name in active)
+    return f'''
+    WITH hits AS (
+        SELECT recipes_fts.rowid, bm25(recipes_fts) AS score
+        FROM recipes_fts
+        JOIN recipes r ON r.id = recipes_fts.rowid
+        WHERE recipes_fts MATCH :match{where}
+        ORDER BY score
+        LIMIT :limit
+    )
+    SELECT {_SEARCH_SELECT}
+    FROM hits
+    JOIN recipes r ON r.id = hits.rowid
+    ORDER BY hits.score, r.popularity_score DESC
+'''
+
+# Keyed by the frozenset of active filter names
+SEARCH_BY_INGREDIENTS_FILTERED_SQL = {
+    frozenset(active): _filtered_search_sql(active)
+    for active in (
+        [name for bit, (name, _) in enumerate(_SEARCH_FILTER_CLAUSES) if mask >> bit & 1]
+        for mask in range(1, 2 ** len(_SEARCH_FILTER_CLAUSES))
+    )
+}
+
+HEALTH_CHECK_SQL = 'SELECT 1'
+
+# Autocomplete: word-prefix MATCH against the prefix-indexed FTS5 table;
+# an empty query lists names in idx_ingredients_name_nocase order
+SUGGEST_INGREDIENTS_SQL = '''
+    SELECT name
+    FROM common_ingredients_fts
+    WHERE common_ingredients_fts MATCH ?
+    ORDER BY rank, name
+    LIMIT ?
+'''
+
+LIST_INGREDIENTS_SQL = 'SELECT name FROM common_ingredients ORDER BY name COLLATE NOCASE LIMIT ?'
+
+POPULARITY_UPDATE_SQL = '''
+    UPDATE recipes 
+    SET popularity_score = popularity_score + ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+# Popularity increments are buffered in memory and written in one batch
+POPULARITY_FLUSH_SECONDS = 5
+POPULARITY_FLUSH_EVENTS = 500
+
+# Parsed Recipe objects kept per (recipe_id, row version)
+RECIPE_CACHE_SIZE = 2048
+
+RECIPE_INSERT_SQL = '''
+    INSERT OR IGNORE INTO recipes 
+    (name, ingredients, instructions, cuisine_type, difficulty_level, 
+     cook_time_minutes, serving_size, calories_per_serving, dietary_tags, source)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Row-by-row FTS maintenance; bulk_insert_recipes swaps it for one 'rebuild'
+RECIPES_FTS_INSERT_TRIGGER_SQL = '''
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_insert 
+    AFTER INSERT ON recipes
+    FOR EACH ROW
+    BEGIN
+        INSERT INTO recipes_fts(rowid, name, ingredients, instructions, dietary_tags)
+        VALUES (NEW.id, NEW.name, NEW.ingredients, NEW.instructions, NEW.dietary_tags);
+    END
+'''
+
+# Retention rules applied by cleanup_old_data, deleted in bounded batches
+CLEANUP_BATCH_SIZE = 1000
+CLEANUP_STATEMENTS = (
+    # Search logs older than 30 days
+    ('search_logs', '''
+        DELETE FROM search_logs WHERE rowid IN (
+            SELECT rowid FROM search_logs
+            WHERE search_timestamp < datetime('now', '-30 days') LIMIT ?
+        )
+    '''),
+    # Expired pantry items
+    ('pantry_items', '''
+        DELETE FROM pantry_items WHERE rowid IN (
+            SELECT rowid FROM pantry_items
+            WHERE expiry_date < date('now') LIMIT ?
+        )
+    '''),
+    # Inactive user sessions older than 7 days
+    ('users', '''
+        DELETE FROM users WHERE rowid IN (
+            SELECT rowid FROM users
+            WHERE last_active < datetime('now', '-7 days') LIMIT ?
+        )
+    '''),
+)
+
+# Statements compiled on every pooled connection once the schema exists
+HOT_STATEMENTS = (
+    (HEALTH_CHECK_SQL, ()),
+    (RECIPE_BY_ID_SQL, (0,)),
+    (RECIPE_VERSION_SQL, (0,)),
+    (SEARCH_BY_INGREDIENTS_SQL, ('""', 0)),
+    *((sql, {'match': '""', 'cuisine_type': '', 'max_cook_time': 0, 'difficulty': 0, 'limit': 0})
+      for sql in SEARCH_BY_INGREDIENTS_FILTERED_SQL.values()),
+    (SUGGEST_INGREDIENTS_SQL, ('""*', 0)),
+    (LIST_INGREDIENTS_SQL, (0,)),
+)
+
 
 class DatabaseManager:
     """
-    Thread-safe database connection manager with connection pooling
+    Thread-safe SQLite connection manager: one writer plus a pool of readers
+
+    WAL mode lets readers run concurrently with the single writer, so reads
+    borrow from a bounded pool of query-only connections and never wait on
+    the write lock. Connections are opened lazily on first use and reused for
+    the lifetime of the process, keeping the page cache warm.
     """
-    
-    def __init__(self, db_path):
+
+    def __init__(self, db_path, pool_size=None):
         self.db_path = db_path
-        self._connection = None
-        
-    def get_connection(self):
-        """Get or create database connection with optimized settings"""
-        if self._connection is None:
-            self._connection = sqlite3.connect(
-                self.db_path,
-                check_same_thread=False,
-                timeout=20.0
-            )
-            
-            # Enable SQLite optimizations
-            self._connection.execute('PRAGMA journal_mode=WAL')  # Write-Ahead Logging
-            self._connection.execute('PRAGMA synchronous=NORMAL')  # Faster writes
-            self._connection.execute('PRAGMA cache_size=10000')  # Larger cache
-            self._connection.execute('PRAGMA temp_store=MEMORY')  # Use memory for temp
-            self._connection.execute('PRAGMA mmap_size=268435456')  # Memory mapping
-            
-            # Enable foreign keys
-            self._connection.execute('PRAGMA foreign_keys=ON')
-            
-            # Set row factory for dict-like access
-            self._connection.row_factory = sqlite3.Row
-            
-        return self._connection
-    
-    def close_connection(self):
-        """Close database connection"""
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        # In-memory databases are private to a connection, so everything shares the writer
+        self.shared_connection = db_path == ':memory:'
+        if pool_size is None:
+            pool_size = 0 if self.shared_connection else min(32, (os.cpu_count() or 1) * 4)
+        self.pool_size = pool_size
+        self._readers = queue.Queue(maxsize=max(pool_size, 1))
+        self._writer = None
+        self.write_lock = Lock()
+        self._lock = Lock()
+        self._initialized = False
+        
+    def _create_connection(self, read_only=False):
+        """Open a new database connection with optimized settings"""
+        db_config = Config.get_database_config()
+        connection = sqlite3.connect(
+            self.db_path,
+            check_same_thread=db_config['check_same_thread'],
+            timeout=db_config['timeout'],
+            isolation_level=db_config['isolation_level'],
+            cached_statements=db_config['cached_statements']
+        )
+        
+        # Enable SQLite optimizations
+        connection.execute('PRAGMA journal_mode=WAL')  # Write-Ahead Logging
+        connection.execute('PRAGMA journal_size_limit=67108864')  # Truncate -wal back to 64MB after checkpoints
+        connection.execute('PRAGMA wal_autocheckpoint=1000')  # Checkpoint every 1000 pages
+        connection.execute('PRAGMA busy_timeout=5000')  # Wait up to 5s on a locked database
+        connection.execute('PRAGMA synchronous=NORMAL')  # Faster writes
+        connection.execute('PRAGMA cache_size=-64000')  # 64MB page cache
+        connection.execute('PRAGMA temp_store=MEMORY')  # Use memory for temp
+        connection.execute('PRAGMA mmap_size=1073741824')  # Memory mapping (1GB cap, maps only what exists)
+        
+        # Enable foreign keys
+        connection.execute('PRAGMA foreign_keys=ON')
+        
+        if read_only:
+            connection.execute('PRAGMA query_only=1')  # Reader connections never write
+        
+        # Set row factory for dict-like access
+        connection.row_factory = sqlite3.Row
+        
+        return connection
+
+    def _prepare_new_database(self):
+        """Use 8KB pages for a brand-new database file (must happen before WAL is enabled)"""
+        if self.shared_connection:
+            return
+        if os.path.exists(self.db_path) and os.path.getsize(self.db_path) > 0:
+            return
+        connection = sqlite3.connect(self.db_path)
+        try:
+            connection.execute('PRAGMA page_size=8192')
+            connection.execute('VACUUM')
+        finally:
+            connection.close()
+
+    def _initialize(self):
+        """Open the writer and the reader pool on first use"""
+        with self._lock:
+            if self._initialized:
+                return
+            self._prepare_new_database()
+            self._writer = self._create_connection()
+            for _ in range(self.pool_size):
+                self._readers.put(self._create_connection(read_only=True))
+            self._initialized = True
+            logger.info(f"Opened SQLite writer connection and {self.pool_size} reader connections")
+
+    def get_writer(self):
+        """Get the single writer connection (callers must hold write_lock)"""
+        if not self._initialized:
+            self._initialize()
+        return self._writer
+
+    def acquire_reader(self):
+        """Take a reader connection from the pool, blocking until one is free"""
+        if not self._initialized:
+            self._initialize()
+        return self._readers.get()
+
+    def release_reader(self, connection):
+        """Return a reader connection to the pool"""
+        self._readers.put(connection)
+
+    def prime_statements(self, statements):
+        """
+        Compile hot read statements on every pooled reader connection
+        
+        Args:
+            statements (tuple): (sql, params) pairs to execute once per connection
+        """
+        if self.shared_connection:
+            return
+        connections = [self.acquire_reader() for _ in range(self.pool_size)]
+        try:
+            for connection in connections:
+                for sql, params in statements:
+                    connection.execute(sql, params).fetchall()
+        finally:
+            for connection in connections:
+                self.release_reader(connection)
+
+    def close_all(self):
+        """Close the writer and every pooled reader connection"""
+        with self._lock:
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._initialized = False
 
 # Global database manager instance
 db_manager = DatabaseManager(Config.DATABASE_PATH)
@@ -72,28 +334,54 @@ db_manager = DatabaseManager(Config.DATABASE_PATH)
 @contextmanager
 def get_db_connection():
     """
-    Context manager for database connections with automatic cleanup
-    
+    Context manager for the writer connection with automatic cleanup
+
+    Each block runs in one BEGIN IMMEDIATE transaction, so the write lock is
+    taken up-front and a contended writer waits on busy_timeout instead of
+    failing with SQLITE_BUSY when upgrading a deferred read transaction.
+
     Yields:
         sqlite3.Connection: Database connection
     """
-    with db_lock:
-        conn = db_manager.get_connection()
+    with db_manager.write_lock:
+        conn = db_manager.get_writer()
+        conn.execute('BEGIN IMMEDIATE')
         try:
             yield conn
         except Exception as e:
-            conn.rollback()
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
             logger.error(f"Database error: {e}")
             raise
         else:
-            conn.commit()
+            if conn.in_transaction:
+                conn.execute('COMMIT')
+
+@contextmanager
+def get_read_connection():
+    """
+    Context manager for a pooled read-only connection (no write lock taken)
+
+    Yields:
+        sqlite3.Connection: Query-only database connection
+    """
+    if db_manager.shared_connection:
+        with get_db_connection() as conn:
+            yield conn
+        return
+
+    conn = db_manager.acquire_reader()
+    try:
+        yield conn
+    finally:
+        db_manager.release_reader(conn)
 
 def init_db():
     """
     Initialize database with optimized schema and indexes
     """
     logger.info("Initializing database...")
-    
+
     with get_db_connection() as conn:
         # Create recipes table with optimized structure
         conn.execute('''
@@ -112,18 +400,29 @@ def init_db():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 popularity_score REAL DEFAULT 0.0,
+                avg_rating REAL,  -- maintained by recipe_ratings triggers
+                rating_count INTEGER DEFAULT 0,
                 
                 -- Full-text search support
                 UNIQUE(name, cuisine_type)
             )
         ''')
         
+        # Migrate databases created before the denormalized rating columns
+        recipe_columns = {row['name'] for row in conn.execute('PRAGMA table_info(recipes)')}
+        if 'avg_rating' not in recipe_columns:
+            conn.execute('ALTER TABLE recipes ADD COLUMN avg_rating REAL')
+        if 'rating_count' not in recipe_columns:
+            conn.execute('ALTER TABLE recipes ADD COLUMN rating_count INTEGER DEFAULT 0')
+        
         # Create indexes for fast querying
         conn.execute('CREATE INDEX IF NOT EXISTS idx_recipes_cuisine ON recipes(cuisine_type)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_recipes_difficulty ON recipes(difficulty_level)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_recipes_cook_time ON recipes(cook_time_minutes)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_recipes_popularity ON recipes(popularity_score DESC)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_recipes_created_at ON recipes(created_at)')
+        # Filtered ingredient search: equality columns first, cook time evaluated from the index
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_recipes_filters ON recipes(cuisine_type, difficulty_level, cook_time_minutes)')
         
         # Full-text search virtual table for ingredients
         conn.execute('''
@@ -133,6 +432,41 @@ def init_db():
             )
         ''')
         
+        # Normalized list columns; recipes.ingredients/dietary_tags stay as the
+        # JSON source of truth for FTS and are mirrored here by triggers
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS recipe_ingredients (
+                recipe_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                
+                PRIMARY KEY (recipe_id, position),
+                FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        ''')
+        
+        # recipe_tags gained a position column; the table is a derived mirror, so an
+        # old-layout copy is dropped with its triggers and rebuilt by the backfill below
+        tag_columns = {row['name'] for row in conn.execute('PRAGMA table_info(recipe_tags)')}
+        if tag_columns and 'position' not in tag_columns:
+            conn.execute('DROP TRIGGER IF EXISTS recipes_lists_insert')
+            conn.execute('DROP TRIGGER IF EXISTS recipes_lists_update')
+            conn.execute('DROP TABLE recipe_tags')
+        
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS recipe_tags (
+                recipe_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                
+                PRIMARY KEY (recipe_id, position),
+                FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        ''')
+        
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_name ON recipe_ingredients(name, recipe_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_recipe_tags_tag ON recipe_tags(tag, recipe_id)')
+        
         # Users table for pantry management
         conn.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -186,36 +520,54 @@ def init_db():
             )
         ''')
         
+        # Backfill rating aggregates when the columns were just added
+        if 'avg_rating' not in recipe_columns:
+            conn.execute('''
+                UPDATE recipes SET
+                    avg_rating = (SELECT AVG(rating) FROM recipe_ratings WHERE recipe_id = recipes.id),
+                    rating_count = (SELECT COUNT(rating) FROM recipe_ratings WHERE recipe_id = recipes.id)
+            ''')
+        
+        # Keep recipes.avg_rating/rating_count in sync with recipe_ratings so
+        # reads never aggregate ratings (recomputed per affected recipe via idx_ratings_recipe)
+        for event, ref in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            conn.execute(f'DROP TRIGGER IF EXISTS recipe_ratings_{event.lower()}')
+            conn.execute(f'''
+                CREATE TRIGGER recipe_ratings_{event.lower()}
+                AFTER {event} ON recipe_ratings
+                FOR EACH ROW
+                BEGIN
+                    UPDATE recipes SET
+                        avg_rating = (SELECT AVG(rating) FROM recipe_ratings WHERE recipe_id = {ref}.recipe_id),
+                        rating_count = (SELECT COUNT(rating) FROM recipe_ratings WHERE recipe_id = {ref}.recipe_id),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = {ref}.recipe_id;
+                END
+            ''')
+        
         # Additional indexes for performance
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_pantry_user ON pantry_items(user_id)')
+        # (user_id, expiry_date) serves per-user listing and the expiring-items range scan;
+        # it supersedes the user_id-only index
+        conn.execute('DROP INDEX IF EXISTS idx_pantry_user')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_pantry_user_expiry ON pantry_items(user_id, expiry_date)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_pantry_ingredient ON pantry_items(ingredient_name)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_search_logs_timestamp ON search_logs(search_timestamp)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_pantry_expiry ON pantry_items(expiry_date)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_users_last_active ON users(last_active)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_ratings_recipe ON recipe_ratings(recipe_id)')
         
-        # Triggers for maintaining updated_at timestamps
-        conn.execute('''
-            CREATE TRIGGER IF NOT EXISTS update_recipe_timestamp 
-            AFTER UPDATE ON recipes
-            FOR EACH ROW
-            BEGIN
-                UPDATE recipes SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-            END
-        ''')
+        # updated_at is set by the UPDATE statements themselves; the old trigger
+        # issued a second UPDATE per row and re-fired the FTS trigger
+        conn.execute('DROP TRIGGER IF EXISTS update_recipe_timestamp')
         
         # Trigger for maintaining FTS index
-        conn.execute('''
-            CREATE TRIGGER IF NOT EXISTS recipes_fts_insert 
-            AFTER INSERT ON recipes
-            FOR EACH ROW
-            BEGIN
-                INSERT INTO recipes_fts(rowid, name, ingredients, instructions, dietary_tags)
-                VALUES (NEW.id, NEW.name, NEW.ingredients, NEW.instructions, NEW.dietary_tags);
-            END
-        ''')
+        conn.execute(RECIPES_FTS_INSERT_TRIGGER_SQL)
         
+        # Only re-index when an indexed column changes, not on popularity/rating bumps
+        conn.execute('DROP TRIGGER IF EXISTS recipes_fts_update')
         conn.execute('''
-            CREATE TRIGGER IF NOT EXISTS recipes_fts_update 
-            AFTER UPDATE ON recipes
+            CREATE TRIGGER recipes_fts_update 
+            AFTER UPDATE OF name, ingredients, instructions, dietary_tags ON recipes
             FOR EACH ROW
             BEGIN
                 UPDATE recipes_fts SET 
@@ -236,122 +588,221 @@ def init_db():
             END
         ''')
         
+        # Mirror the JSON list columns into recipe_ingredients/recipe_tags
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS recipes_lists_insert 
+            AFTER INSERT ON recipes
+            FOR EACH ROW
+            BEGIN
+                INSERT OR IGNORE INTO recipe_ingredients(recipe_id, position, name)
+                SELECT NEW.id, key, value FROM json_each(CASE WHEN json_valid(NEW.ingredients) THEN NEW.ingredients ELSE '[]' END);
+                INSERT OR IGNORE INTO recipe_tags(recipe_id, position, tag)
+                SELECT NEW.id, key, value FROM json_each(CASE WHEN json_valid(NEW.dietary_tags) THEN NEW.dietary_tags ELSE '[]' END);
+            END
+        ''')
+        
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS recipes_lists_update 
+            AFTER UPDATE OF ingredients, dietary_tags ON recipes
+            FOR EACH ROW
+            BEGIN
+                DELETE FROM recipe_ingredients WHERE recipe_id = NEW.id;
+                DELETE FROM recipe_tags WHERE recipe_id = NEW.id;
+                INSERT OR IGNORE INTO recipe_ingredients(recipe_id, position, name)
+                SELECT NEW.id, key, value FROM json_each(CASE WHEN json_valid(NEW.ingredients) THEN NEW.ingredients ELSE '[]' END);
+                INSERT OR IGNORE INTO recipe_tags(recipe_id, position, tag)
+                SELECT NEW.id, key, value FROM json_each(CASE WHEN json_valid(NEW.dietary_tags) THEN NEW.dietary_tags ELSE '[]' END);
+            END
+        ''')
+        
+        # Backfill the normalized tables for recipes stored before they existed
+        if conn.execute('SELECT 1 FROM recipe_ingredients LIMIT 1').fetchone() is None:
+            conn.execute('''
+                INSERT OR IGNORE INTO recipe_ingredients(recipe_id, position, name)
+                SELECT r.id, j.key, j.value
+                FROM recipes r, json_each(r.ingredients) j
+                WHERE json_valid(r.ingredients)
+            ''')
+        if conn.execute('SELECT 1 FROM recipe_tags LIMIT 1').fetchone() is None:
+            conn.execute('''
+                INSERT OR IGNORE INTO recipe_tags(recipe_id, position, tag)
+                SELECT r.id, j.key, j.value
+                FROM recipes r, json_each(r.dietary_tags) j
+                WHERE json_valid(r.dietary_tags)
+            ''')
+        
         logger.info("Database schema created successfully")
         
         # Seed with initial data
         seed_sudanese_recipes(conn)
         seed_common_ingredients(conn)
 
+    # Warm each pooled connection's statement cache now that the tables exist
+    db_manager.prime_statements(HOT_STATEMENTS)
+
+# Built-in seed data, used when the JSON seed files are not present
+SUDANESE_RECIPES = (
+    {
+        "name": "Ful Medames",
+        "ingredients": ["fava beans", "olive oil", "lemon juice", "garlic", "cumin", "salt", "tomatoes", "onions"],
+        "instructions": "1. Soak fava beans overnight and cook until tender. 2. Mash partially, keeping some texture. 3. Heat olive oil in pan, sauté garlic and onions. 4. Add mashed beans, season with cumin, salt, and lemon juice. 5. Serve hot with diced tomatoes on top. 6. Traditionally served with flatbread.",
+        "cuisine_type": "sudanese",
+        "difficulty_level": 2,
+        "cook_time_minutes": 45,
+        "serving_size": 4,
+        "calories_per_serving": 280,
+        "dietary_tags": '["vegetarian", "vegan", "high-protein", "gluten-free"]',
+        "source": "traditional"
+    },
+    {
+        "name": "Sudanese Bamia (Okra Stew)",
+        "ingredients": ["okra", "lamb", "onions", "tomatoes", "garlic", "coriander", "cardamom", "cinnamon", "bay leaves", "salt", "pepper"],
+        "instructions": "1. Cut okra into rounds, salt and let sit for 30 minutes. 2. Brown lamb pieces in large pot. 3. Add onions, cook until soft. 4. Add spices, garlic, cook for 1 minute. 5. Add tomatoes and okra, cover with water. 6. Simmer for 1 hour until meat is tender. 7. Serve with rice or bread.",
+        "cuisine_type": "sudanese",
+        "difficulty_level": 3,
+        "cook_time_minutes": 90,
+        "serving_size": 6,
+        "calories_per_serving": 320,
+        "dietary_tags": '["high-protein", "gluten-free"]',
+        "source": "traditional"
+    },
+    {
+        "name": "Kisra (Sudanese Flatbread)",
+        "ingredients": ["sorghum flour", "water", "salt", "yeast"],
+        "instructions": "1. Mix sorghum flour with warm water to make a smooth batter. 2. Add salt and yeast, mix well. 3. Let ferment for 2-3 hours until bubbly. 4. Heat a flat pan over medium heat. 5. Pour batter thinly across pan, like making crepes. 6. Cook until edges lift and bottom is golden. 7. Serve warm with stews or dips.",
+        "cuisine_type": "sudanese",
+        "difficulty_level": 4,
+        "cook_time_minutes": 30,
+        "serving_size": 8,
+        "calories_per_serving": 120,
+        "dietary_tags": '["vegan", "gluten-free", "fermented"]',
+        "source": "traditional"
+    },
+    {
+        "name": "Sudanese Mulah (Green Stew)",
+        "ingredients": ["spinach", "collard greens", "beef", "onions", "peanut butter", "tomato paste", "garlic", "ginger", "chili", "salt"],
+        "instructions": "1. Clean and chop greens finely. 2. Brown beef in large pot. 3. Add onions, cook until soft. 4. Add garlic, ginger, chili, cook 2 minutes. 5. Add tomato paste, cook 3 minutes. 6. Add greens and water, simmer 30 minutes. 7. Stir in peanut butter until dissolved. 8. Season with salt, simmer 15 more minutes.",
+        "cuisine_type": "sudanese",
+        "difficulty_level": 3,
+        "cook_time_minutes": 75,
+        "serving_size": 6,
+        "calories_per_serving": 350,
+        "dietary_tags": '["high-protein", "high-iron", "gluten-free"]',
+        "source": "traditional"
+    }
+)
+
+COMMON_INGREDIENT_CATEGORIES = {
+    "proteins": ["chicken", "beef", "lamb", "fish", "eggs", "tofu", "lentils", "chickpeas", "beans"],
+    "vegetables": ["tomatoes", "onions", "garlic", "carrots", "potatoes", "spinach", "broccoli", 
+                  "bell peppers", "mushrooms", "zucchini", "eggplant", "okra", "cabbage"],
+    "grains": ["rice", "pasta", "bread", "flour", "quinoa", "barley", "oats", "couscous"],
+    "spices": ["salt", "pepper", "cumin", "coriander", "turmeric", "paprika", "cinnamon", 
+              "cardamom", "ginger", "basil", "parsley", "cilantro", "mint"],
+    "pantry": ["olive oil", "vegetable oil", "butter", "coconut oil", "vinegar", "lemon juice",
+              "soy sauce", "tomato paste", "coconut milk", "peanut butter"],
+    "sudanese": ["fava beans", "sorghum flour", "peanuts", "sesame seeds", "tamarind", "hibiscus"]
+}
+
+def _load_json_file(path):
+    """Parse a JSON file through a read-only memory map"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return orjson.loads(mm)
+
+@functools.lru_cache(maxsize=1)
+def load_sudanese_recipes():
+    """
+    Load Sudanese seed recipes once (from SUDANESE_RECIPES_PATH if present)
+
+    Returns:
+        tuple: Recipe dictionaries
+    """
+    if os.path.exists(Config.SUDANESE_RECIPES_PATH):
+        recipes = _load_json_file(Config.SUDANESE_RECIPES_PATH)
+        if recipes:
+            return tuple(recipes)
+    return SUDANESE_RECIPES
+
+@functools.lru_cache(maxsize=1)
+def load_ingredient_categories():
+    """
+    Load common ingredients grouped by category once (from COMMON_INGREDIENTS_PATH if present)
+
+    Returns:
+        MappingProxyType: Category name -> tuple of ingredient names
+    """
+    categories = COMMON_INGREDIENT_CATEGORIES
+    if os.path.exists(Config.COMMON_INGREDIENTS_PATH):
+        categories = _load_json_file(Config.COMMON_INGREDIENTS_PATH) or categories
+    return MappingProxyType({category: tuple(names) for category, names in categories.items()})
+
+@functools.lru_cache(maxsize=1)
+def load_common_ingredients():
+    """
+    Get the set of all common ingredient names
+
+    Returns:
+        frozenset: Ingredient names across every category
+    """
+    return frozenset(name for names in load_ingredient_categories().values() for name in names)
+
 def seed_sudanese_recipes(conn):
     """
     Seed database with authentic Sudanese recipes for cultural integration
     """
-    sudanese_recipes = [
-        {
-            "name": "Ful Medames",
-            "ingredients": ["fava beans", "olive oil", "lemon juice", "garlic", "cumin", "salt", "tomatoes", "onions"],
-            "instructions": "1. Soak fava beans overnight and cook until tender. 2. Mash partially, keeping some texture. 3. Heat olive oil in pan, sauté garlic and onions. 4. Add mashed beans, season with cumin, salt, and lemon juice. 5. Serve hot with diced tomatoes on top. 6. Traditionally served with flatbread.",
-            "cuisine_type": "sudanese",
-            "difficulty_level": 2,
-            "cook_time_minutes": 45,
-            "serving_size": 4,
-            "calories_per_serving": 280,
-            "dietary_tags": '["vegetarian", "vegan", "high-protein", "gluten-free"]',
-            "source": "traditional"
-        },
-        {
-            "name": "Sudanese Bamia (Okra Stew)",
-            "ingredients": ["okra", "lamb", "onions", "tomatoes", "garlic", "coriander", "cardamom", "cinnamon", "bay leaves", "salt", "pepper"],
-            "instructions": "1. Cut okra into rounds, salt and let sit for 30 minutes. 2. Brown lamb pieces in large pot. 3. Add onions, cook until soft. 4. Add spices, garlic, cook for 1 minute. 5. Add tomatoes and okra, cover with water. 6. Simmer for 1 hour until meat is tender. 7. Serve with rice or bread.",
-            "cuisine_type": "sudanese",
-            "difficulty_level": 3,
-            "cook_time_minutes": 90,
-            "serving_size": 6,
-            "calories_per_serving": 320,
-            "dietary_tags": '["high-protein", "gluten-free"]',
-            "source": "traditional"
-        },
-        {
-            "name": "Kisra (Sudanese Flatbread)",
-            "ingredients": ["sorghum flour", "water", "salt", "yeast"],
-            "instructions": "1. Mix sorghum flour with warm water to make a smooth batter. 2. Add salt and yeast, mix well. 3. Let ferment for 2-3 hours until bubbly. 4. Heat a flat pan over medium heat. 5. Pour batter thinly across pan, like making crepes. 6. Cook until edges lift and bottom is golden. 7. Serve warm with stews or dips.",
-            "cuisine_type": "sudanese",
-            "difficulty_level": 4,
-            "cook_time_minutes": 30,
-            "serving_size": 8,
-            "calories_per_serving": 120,
-            "dietary_tags": '["vegan", "gluten-free", "fermented"]',
-            "source": "traditional"
-        },
-        {
-            "name": "Sudanese Mulah (Green Stew)",
-            "ingredients": ["spinach", "collard greens", "beef", "onions", "peanut butter", "tomato paste", "garlic", "ginger", "chili", "salt"],
-            "instructions": "1. Clean and chop greens finely. 2. Brown beef in large pot. 3. Add onions, cook until soft. 4. Add garlic, ginger, chili, cook 2 minutes. 5. Add tomato paste, cook 3 minutes. 6. Add greens and water, simmer 30 minutes. 7. Stir in peanut butter until dissolved. 8. Season with salt, simmer 15 more minutes.",
-            "cuisine_type": "sudanese",
-            "difficulty_level": 3,
-            "cook_time_minutes": 75,
-            "serving_size": 6,
-            "calories_per_serving": 350,
-            "dietary_tags": '["high-protein", "high-iron", "gluten-free"]',
-            "source": "traditional"
-        }
-    ]
-    
+    sudanese_recipes = load_sudanese_recipes()
+
     # Check if Sudanese recipes already exist
     existing = conn.execute('SELECT COUNT(*) FROM recipes WHERE cuisine_type = "sudanese"').fetchone()[0]
-    
+
     if existing == 0:
         logger.info("Seeding Sudanese recipes...")
-        for recipe in sudanese_recipes:
-            try:
-                conn.execute('''
-                    INSERT INTO recipes 
-                    (name, ingredients, instructions, cuisine_type, difficulty_level, 
-                     cook_time_minutes, serving_size, calories_per_serving, dietary_tags, source)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    recipe['name'],
-                    json.dumps(recipe['ingredients']),
-                    recipe['instructions'],
-                    recipe['cuisine_type'],
-                    recipe['difficulty_level'],
-                    recipe['cook_time_minutes'],
-                    recipe['serving_size'],
-                    recipe['calories_per_serving'],
-                    recipe['dietary_tags'],
-                    recipe['source']
-                ))
-                logger.info(f"Added Sudanese recipe: {recipe['name']}")
-            except sqlite3.IntegrityError:
-                logger.info(f"Recipe {recipe['name']} already exists, skipping...")
-    
+        rows = [
+            (
+                recipe['name'],
+                orjson.dumps(recipe['ingredients']).decode(),
+                recipe['instructions'],
+                recipe['cuisine_type'],
+                recipe['difficulty_level'],
+                recipe['cook_time_minutes'],
+                recipe['serving_size'],
+                recipe['calories_per_serving'],
+                recipe['dietary_tags'] if isinstance(recipe['dietary_tags'], str) else orjson.dumps(recipe['dietary_tags']).decode(),
+                recipe['source']
+            )
+            for recipe in sudanese_recipes
+        ]
+        bulk_insert_recipes(rows, conn=conn)
+        logger.info(f"Added {len(rows)} Sudanese recipes")
+
+def bulk_insert_recipes(rows, conn=None):
+    """
+    Insert many recipes and build their FTS entries in a single pass
+
+    The per-row FTS trigger is dropped for the duration of the insert and the
+    index is rebuilt once afterwards, all inside the same write transaction.
+
+    Args:
+        rows (list): Tuples in RECIPE_INSERT_SQL column order (JSON-encoded lists)
+        conn (sqlite3.Connection, optional): Writer connection already held by the caller
+    """
+    if conn is None:
+        with get_db_connection() as conn:
+            return bulk_insert_recipes(rows, conn=conn)
+
+    conn.execute('DROP TRIGGER IF EXISTS recipes_fts_insert')
+    # One prepared statement for the whole batch; duplicates are skipped by UNIQUE(name, cuisine_type)
+    conn.executemany(RECIPE_INSERT_SQL, rows)
+    conn.execute("INSERT INTO recipes_fts(recipes_fts) VALUES('rebuild')")
+    conn.execute(RECIPES_FTS_INSERT_TRIGGER_SQL)
+
 def seed_common_ingredients(conn):
     """
     Seed database with common ingredients for autocomplete and suggestions
     """
-    common_ingredients = [
-        # Proteins
-        "chicken", "beef", "lamb", "fish", "eggs", "tofu", "lentils", "chickpeas", "beans",
-        
-        # Vegetables
-        "tomatoes", "onions", "garlic", "carrots", "potatoes", "spinach", "broccoli", 
-        "bell peppers", "mushrooms", "zucchini", "eggplant", "okra", "cabbage",
-        
-        # Grains & Starches
-        "rice", "pasta", "bread", "flour", "quinoa", "barley", "oats", "couscous",
-        
-        # Spices & Herbs
-        "salt", "pepper", "cumin", "coriander", "turmeric", "paprika", "cinnamon", 
-        "cardamom", "ginger", "basil", "parsley", "cilantro", "mint",
-        
-        # Pantry Staples
-        "olive oil", "vegetable oil", "butter", "coconut oil", "vinegar", "lemon juice",
-        "soy sauce", "tomato paste", "coconut milk", "peanut butter",
-        
-        # Sudanese Specific
-        "fava beans", "sorghum flour", "peanuts", "sesame seeds", "tamarind", "hibiscus"
-    ]
-    
     # Create ingredients reference table if not exists
     conn.execute('''
         CREATE TABLE IF NOT EXISTS common_ingredients (
@@ -363,149 +814,335 @@ def seed_common_ingredients(conn):
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
-    conn.execute('CREATE INDEX IF NOT EXISTS idx_ingredients_name ON common_ingredients(name)')
+
+    # The UNIQUE constraint already indexes name; the NOCASE index orders the empty-query listing
+    conn.execute('DROP INDEX IF EXISTS idx_ingredients_name')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_ingredients_name_nocase ON common_ingredients(name COLLATE NOCASE)')
     conn.execute('CREATE INDEX IF NOT EXISTS idx_ingredients_category ON common_ingredients(category)')
-    
+
     # Check if ingredients are already seeded
     existing_count = conn.execute('SELECT COUNT(*) FROM common_ingredients').fetchone()[0]
-    
+
     if existing_count == 0:
         logger.info("Seeding common ingredients...")
         
-        # Categorize ingredients
-        categories = {
-            "proteins": ["chicken", "beef", "lamb", "fish", "eggs", "tofu", "lentils", "chickpeas", "beans"],
-            "vegetables": ["tomatoes", "onions", "garlic", "carrots", "potatoes", "spinach", "broccoli", 
-                          "bell peppers", "mushrooms", "zucchini", "eggplant", "okra", "cabbage"],
-            "grains": ["rice", "pasta", "bread", "flour", "quinoa", "barley", "oats", "couscous"],
-            "spices": ["salt", "pepper", "cumin", "coriander", "turmeric", "paprika", "cinnamon", 
-                      "cardamom", "ginger", "basil", "parsley", "cilantro", "mint"],
-            "pantry": ["olive oil", "vegetable oil", "butter", "coconut oil", "vinegar", "lemon juice",
-                      "soy sauce", "tomato paste", "coconut milk", "peanut butter"],
-            "sudanese": ["fava beans", "sorghum flour", "peanuts", "sesame seeds", "tamarind", "hibiscus"]
-        }
-        
-        for category, ingredients in categories.items():
-            for ingredient in ingredients:
-                try:
-                    conn.execute('''
-                        INSERT INTO common_ingredients (name, category)
-                        VALUES (?, ?)
-                    ''', (ingredient, category))
-                except sqlite3.IntegrityError:
-                    pass  # Ingredient already exists
-        
-        logger.info(f"Seeded {len(common_ingredients)} common ingredients")
+        categories = load_ingredient_categories()
+        
+        conn.executemany('''
+            INSERT OR IGNORE INTO common_ingredients (name, category)
+            VALUES (?, ?)
+        ''', [(ingredient, category) for category, ingredients in categories.items() for ingredient in ingredients])
+        
+        logger.info(f"Seeded {len(load_common_ingredients())} common ingredients")
+
+    # Prefix-indexed FTS5 table for autocomplete (2-4 character prefixes resolve from the index)
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS common_ingredients_fts USING fts5(
+            name,
+            content='common_ingredients', content_rowid='id',
+            prefix='2 3 4'
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS common_ingredients_fts_insert 
+        AFTER INSERT ON common_ingredients
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO common_ingredients_fts(rowid, name) VALUES (NEW.id, NEW.name);
+        END
+    ''')
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS common_ingredients_fts_update 
+        AFTER UPDATE OF name ON common_ingredients
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO common_ingredients_fts(common_ingredients_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+            INSERT INTO common_ingredients_fts(rowid, name) VALUES (NEW.id, NEW.name);
+        END
+    ''')
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS common_ingredients_fts_delete 
+        AFTER DELETE ON common_ingredients
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO common_ingredients_fts(common_ingredients_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+        END
+    ''')
+
+    # Index rows that were present before the FTS table and its triggers existed
+    if conn.execute('SELECT 1 FROM common_ingredients_fts_docsize LIMIT 1').fetchone() is None:
+        conn.execute("INSERT INTO common_ingredients_fts(common_ingredients_fts) VALUES('rebuild')")
+
+def suggest_ingredient_names(query, limit=10):
+    """
+    Autocomplete ingredient names, treating every word of the query as a prefix
+
+    Args:
+        query (str): Text typed so far
+        limit (int): Maximum number of suggestions
+        
+    Returns:
+        list: Matching ingredient names, best match first
+    """
+    # Quote each word so FTS5 operators in user input are matched literally
+    terms = ' '.join('"{}"*'.format(word.replace('"', '""')) for word in query.split())
+
+    with get_read_connection() as conn:
+        if not terms:
+            rows = conn.execute(LIST_INGREDIENTS_SQL, (limit,)).fetchall()
+        else:
+            rows = conn.execute(SUGGEST_INGREDIENTS_SQL, (terms, limit)).fetchall()
+
+    return [row['name'] for row in rows]
 
 def get_recipe_by_id(recipe_id):
     """
     Get a specific recipe by ID with optimized query
-    
+
     Args:
         recipe_id (int): Recipe ID
         
     Returns:
         dict: Recipe data or None if not found
     """
-    with get_db_connection() as conn:
-        row = conn.execute('''
-            SELECT r.*, AVG(rt.rating) as avg_rating, COUNT(rt.rating) as rating_count
-            FROM recipes r
-            LEFT JOIN recipe_ratings rt ON r.id = rt.recipe_id
-            WHERE r.id = ?
-            GROUP BY r.id
-        ''', (recipe_id,)).fetchone()
+    with get_read_connection() as conn:
+        row = conn.execute(RECIPE_BY_ID_SQL, (recipe_id,)).fetchone()
         
         if row:
-            return dict(row)
+            return _recipe_row_to_dict(row)
+        return None
+
+def _recipe_row_to_dict(row):
+    """Convert a recipe row to a dict, splitting the joined list columns"""
+    data = dict(row)
+    for column in _LIST_COLUMN_SQL:
+        data[column] = data[column].split(LIST_SEPARATOR) if data[column] else []
+    return data
+
+def get_recipe_model(recipe_id):
+    """
+    Get a parsed Recipe by ID, reusing the cached object until the row changes
+
+    The cache is keyed on the row's mutable columns, read with a primary-key
+    probe, so updates made by any worker process (popularity flushes, rating
+    triggers) are seen by all of them.
+
+    Args:
+        recipe_id (int): Recipe ID
+        
+    Returns:
+        Recipe: Parsed recipe or None if not found
+    """
+    with get_read_connection() as conn:
+        version = conn.execute(RECIPE_VERSION_SQL, (recipe_id,)).fetchone()
+    if version is None:
+        return None
+    try:
+        return _fetch_recipe_model(recipe_id, tuple(version))
+    except LookupError:
         return None
 
-def search_recipes_by_ingredients(ingredients, limit=10):
+@functools.lru_cache(maxsize=RECIPE_CACHE_SIZE)
+def _fetch_recipe_model(recipe_id, version):
+    """Load and parse a recipe row; version only keys the cache entry"""
+    with get_read_connection() as conn:
+        row = conn.execute(RECIPE_BY_ID_SQL, (recipe_id,)).fetchone()
+    if row is None:
+        raise LookupError(recipe_id)  # misses are not cached
+    return Recipe.from_row_positional(row)
+
+def build_ingredient_match(ingredients):
+    """
+    Build the FTS5 MATCH expression for an ingredient search
+
+    Args:
+        ingredients (list): List of ingredient names
+        
+    Returns:
+        str: OR of quoted phrases restricted to the ingredients column
+    """
+    return _ingredient_match(tuple(sorted(set(ingredients))))
+
+@functools.lru_cache(maxsize=1024)
+def _ingredient_match(ingredients):
+    """Cached MATCH expression for a sorted, de-duplicated ingredient tuple"""
+    # Column filter keeps instructions/name mentions out of the posting lists
+    return ' OR '.join('ingredients:"{}"'.format(ingredient.replace('"', '""')) for ingredient in ingredients)
+
+def _search_rows(ingredients, limit, cuisine_type=None, max_cook_time=None, difficulty=None):
+    """Run the ingredient search, filtering in SQL when any filter is set (falsy values disable a filter)"""
+    search_terms = build_ingredient_match(ingredients)
+
+    params = {'cuisine_type': cuisine_type, 'max_cook_time': max_cook_time, 'difficulty': difficulty}
+    active = frozenset(name for name, value in params.items() if value)
+
+    with get_read_connection() as conn:
+        if not active:
+            return conn.execute(SEARCH_BY_INGREDIENTS_SQL, (search_terms, limit)).fetchall()
+        params.update(match=search_terms, limit=limit)
+        return conn.execute(SEARCH_BY_INGREDIENTS_FILTERED_SQL[active], params).fetchall()
+
+def search_recipes_by_ingredients(ingredients, limit=10, cuisine_type=None, max_cook_time=None, difficulty=None):
     """
     Search recipes using full-text search for better matching
-    
+
     Args:
         ingredients (list): List of ingredient names
         limit (int): Maximum number of results
+        cuisine_type (str, optional): Only recipes of this cuisine
+        max_cook_time (int, optional): Only recipes cooking within this many minutes
+        difficulty (int, optional): Only recipes of this difficulty level
         
     Returns:
-        list: List of matching recipes
+        list: List of matching recipes (list-view columns, without instructions)
     """
-    with get_db_connection() as conn:
-        # Build FTS query
-        search_terms = ' OR '.join([f'"{ingredient}"' for ingredient in ingredients])
-        
-        rows = conn.execute('''
-            SELECT r.*, 
-                   AVG(rt.rating) as avg_rating,
-                   COUNT(rt.rating) as rating_count,
-                   recipes_fts.rank
-            FROM recipes_fts
-            JOIN recipes r ON recipes_fts.rowid = r.id
-            LEFT JOIN recipe_ratings rt ON r.id = rt.recipe_id
-            WHERE recipes_fts MATCH ?
-            GROUP BY r.id
-            ORDER BY recipes_fts.rank, r.popularity_score DESC, avg_rating DESC
-            LIMIT ?
-        ''', (search_terms, limit)).fetchall()
-        
-        return [dict(row) for row in rows]
+    rows = _search_rows(ingredients, limit, cuisine_type, max_cook_time, difficulty)
+    return [_recipe_row_to_dict(row) for row in rows]
+
+def search_recipe_models(ingredients, limit=10, cuisine_type=None, max_cook_time=None, difficulty=None):
+    """
+    Search recipes like search_recipes_by_ingredients, returning parsed Recipe objects
+
+    Args:
+        ingredients (list): List of ingredient names
+        limit (int): Maximum number of results
+        cuisine_type (str, optional): Only recipes of this cuisine
+        max_cook_time (int, optional): Only recipes cooking within this many minutes
+        difficulty (int, optional): Only recipes of this difficulty level
+        
+    Returns:
+        list: List of matching Recipe objects
+    """
+    rows = _search_rows(ingredients, limit, cuisine_type, max_cook_time, difficulty)
+    return [Recipe.from_search_row(row) for row in rows]
 
 def update_recipe_popularity(recipe_id, interaction_type='view'):
     """
     Update recipe popularity score based on user interactions
-    
+
+    The increment is buffered in memory and written by flush_recipe_popularity(),
+    either from the background flusher or once POPULARITY_FLUSH_EVENTS pile up.
+
     Args:
         recipe_id (int): Recipe ID
         interaction_type (str): Type of interaction ('view', 'rate', 'cook')
     """
+    global _popularity_events
+
     score_increment = {
         'view': 0.1,
         'rate': 0.5,
         'cook': 1.0
     }
-    
+
     increment = score_increment.get(interaction_type, 0.1)
-    
-    with get_db_connection() as conn:
-        conn.execute('''
-            UPDATE recipes 
-            SET popularity_score = popularity_score + ?
-            WHERE id = ?
-        ''', (increment, recipe_id))
+
+    with _popularity_lock:
+        _popularity_buffer[recipe_id] += increment
+        _popularity_events += 1
+        flush_now = _popularity_events >= POPULARITY_FLUSH_EVENTS
+        _start_popularity_flusher()
+
+    if flush_now:
+        flush_recipe_popularity()
+
+def flush_recipe_popularity():
+    """
+    Write buffered popularity increments in a single transaction
+
+    Returns:
+        int: Number of recipes updated
+    """
+    global _popularity_events
+
+    with _popularity_lock:
+        if not _popularity_buffer:
+            return 0
+        pending = list(_popularity_buffer.items())
+        pending_events = _popularity_events
+        _popularity_buffer.clear()
+        _popularity_events = 0
+
+    try:
+        with get_db_connection() as conn:
+            conn.executemany(POPULARITY_UPDATE_SQL, [(increment, recipe_id) for recipe_id, increment in pending])
+    except Exception:
+        # The transaction rolled back: merge the increments back for the next flush
+        with _popularity_lock:
+            _popularity_buffer.update(dict(pending))
+            _popularity_events += pending_events
+        raise
+
+    return len(pending)
+
+def _start_popularity_flusher():
+    """Start the background flusher thread once (caller holds _popularity_lock)"""
+    global _popularity_flusher
+
+    if _popularity_flusher is not None:
+        return
+
+    def flusher():
+        while True:
+            time.sleep(POPULARITY_FLUSH_SECONDS)
+            try:
+                flush_recipe_popularity()
+            except Exception as e:
+                logger.error(f"Popularity flush failed: {e}")
+
+    _popularity_flusher = Thread(target=flusher, name='popularity-flusher', daemon=True)
+    _popularity_flusher.start()
+
+_popularity_buffer = Counter()
+_popularity_events = 0
+_popularity_lock = Lock()
+_popularity_flusher = None
+atexit.register(flush_recipe_popularity)
 
 def cleanup_old_data():
     """
     Clean up old search logs and expired pantry items
+
+    Each pass deletes up to CLEANUP_BATCH_SIZE rows per table in one write
+    transaction (range scans on the indexed timestamp columns), so a large
+    backlog never holds the write lock for long.
     """
+    flush_recipe_popularity()
+
+    deleted = Counter()
+    while True:
+        with get_db_connection() as conn:
+            pass_counts = {
+                table: conn.execute(sql, (CLEANUP_BATCH_SIZE,)).rowcount
+                for table, sql in CLEANUP_STATEMENTS
+            }
+        deleted.update(pass_counts)
+        if max(pass_counts.values()) < CLEANUP_BATCH_SIZE:
+            break
+
+    # Refresh planner statistics after large deletes
     with get_db_connection() as conn:
-        # Remove search logs older than 30 days
-        conn.execute('''
-            DELETE FROM search_logs 
-            WHERE search_timestamp < datetime('now', '-30 days')
-        ''')
-        
-        # Remove expired pantry items
-        conn.execute('''
-            DELETE FROM pantry_items 
-            WHERE expiry_date < date('now')
-        ''')
-        
-        # Clean up inactive user sessions older than 7 days
-        conn.execute('''
-            DELETE FROM users 
-            WHERE last_active < datetime('now', '-7 days')
-        ''')
-        
-        logger.info("Database cleanup completed")
+        conn.execute('PRAGMA optimize')
+
+    logger.info(f"Database cleanup completed: {dict(deleted)}")
 
 # Export commonly used functions
 __all__ = [
     'init_db',
     'get_db_connection',
+    'get_read_connection',
+    'load_sudanese_recipes',
+    'load_common_ingredients',
     'get_recipe_by_id',
+    'get_recipe_model',
     'search_recipes_by_ingredients',
+    'search_recipe_models',
+    'bulk_insert_recipes',
+    'suggest_ingredient_names',
     'update_recipe_popularity',
+    'flush_recipe_popularity',
     'cleanup_old_data'
 ]
\ No newline at end of file
@@ -4,10 +4,10 @@ PantryItem Model
 Represents a user's saved pantry ingredient with metadata.
 """
 
-from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, asdict, fields
+from typing import Optional, Dict, Any, Sequence
 
-@dataclass
+@dataclass(slots=True)
 class PantryItem:
     id: Optional[int] = None
     user_id: int = 0
@@ -29,5 +29,13 @@ class PantryItem:
             added_at=row.get("added_at")
         )
 
+    @staticmethod
+    def from_row_positional(row: Sequence[Any]) -> "PantryItem":
+        """Create a PantryItem from a row selected in PANTRY_COLUMNS order (no key lookups)"""
+        return PantryItem(*row)
+
     def to_dict(self) -> dict:
-        return asdict(self)
\ No newline at end of file
+        return asdict(self)
+
+# Column order expected by PantryItem.from_row_positional (matches the dataclass fields)
+PANTRY_COLUMNS = tuple(f.name for f in fields(PantryItem))
\ No newline at end of file
@@ -4,11 +4,22 @@ Recipe Model
 Define Recipe data structure and helpers for serialization and db-row mapping
 """
 
-from dataclasses import dataclass, field, asdict
-from typing import List, Optional, Dict, Any
-import json
+from dataclasses import dataclass, field, asdict, fields
+from typing import List, Optional, Dict, Any, Sequence
+import orjson
 
-@dataclass
+# Separator used by the database layer when joining list columns
+LIST_SEPARATOR = '\x1f'
+
+def _load_list(value) -> list:
+    """Decode a JSON list column unless it is already a list"""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    return orjson.loads(value)
+
+@dataclass(slots=True)
 class Recipe:
     id: Optional[int] = None
     name: str = ""
@@ -31,18 +42,20 @@ class Recipe:
     def from_row(row: Dict[str, Any]) -> "Recipe":
         """
         Create a Recipe instance from a sqlite row (dict)
+        
+        List columns may be JSON text or already-loaded lists.
         """
         return Recipe(
             id=row.get("id"),
             name=row["name"],
-            ingredients=json.loads(row["ingredients"]) if row.get("ingredients") else [],
-            instructions=row["instructions"],
+            ingredients=_load_list(row.get("ingredients")),
+            instructions=row.get("instructions", ""),
             cuisine_type=row.get("cuisine_type", "global"),
             difficulty_level=row.get("difficulty_level", 3),
             cook_time_minutes=row.get("cook_time_minutes", 30),
             serving_size=row.get("serving_size", 4),
             calories_per_serving=row.get("calories_per_serving"),
-            dietary_tags=json.loads(row["dietary_tags"]) if row.get("dietary_tags") else [],
+            dietary_tags=_load_list(row.get("dietary_tags")),
             source=row.get("source", "ai_generated"),
             created_at=row.get("created_at"),
             updated_at=row.get("updated_at"),
@@ -51,10 +64,49 @@ class Recipe:
             rating_count=row.get("rating_count")
         )
 
+    @staticmethod
+    def from_row_positional(row: Sequence[Any]) -> "Recipe":
+        """
+        Create a Recipe from a row selected in RECIPE_COLUMNS order (no key lookups)
+        
+        ingredients and dietary_tags arrive as LIST_SEPARATOR-joined strings.
+        """
+        (id, name, ingredients, instructions, cuisine_type, difficulty_level,
+         cook_time_minutes, serving_size, calories_per_serving, dietary_tags, source,
+         created_at, updated_at, popularity_score, avg_rating, rating_count) = row
+        return Recipe(
+            id, name,
+            ingredients.split(LIST_SEPARATOR) if ingredients else [],
+            instructions, cuisine_type, difficulty_level,
+            cook_time_minutes, serving_size, calories_per_serving,
+            dietary_tags.split(LIST_SEPARATOR) if dietary_tags else [],
+            source, created_at, updated_at, popularity_score, avg_rating, rating_count
+        )
+
+    @staticmethod
+    def from_search_row(row: Sequence[Any]) -> "Recipe":
+        """
+        Create a list-view Recipe from a row selected in SEARCH_COLUMNS order
+        
+        instructions is not selected for search results and is left empty.
+        """
+        (id, name, ingredients, cuisine_type, difficulty_level,
+         cook_time_minutes, serving_size, calories_per_serving, dietary_tags, source,
+         created_at, updated_at, popularity_score, avg_rating, rating_count) = row
+        return Recipe(
+            id, name,
+            ingredients.split(LIST_SEPARATOR) if ingredients else [],
+            "", cuisine_type, difficulty_level,
+            cook_time_minutes, serving_size, calories_per_serving,
+            dietary_tags.split(LIST_SEPARATOR) if dietary_tags else [],
+            source, created_at, updated_at, popularity_score, avg_rating, rating_count
+        )
+
     def to_dict(self, include_id=True) -> dict:
         data = asdict(self)
-        data["ingredients"] = self.ingredients
-        data["dietary_tags"] = self.dietary_tags
+        # Fresh lists: models from get_recipe_model are cached and shared between requests
+        data["ingredients"] = list(self.ingredients)
+        data["dietary_tags"] = list(self.dietary_tags)
         if not include_id and "id" in data:
             data.pop("id")
         return data
@@ -72,4 +124,10 @@ class Recipe:
             calories_per_serving=payload.get("calories_per_serving"),
             dietary_tags=payload.get("dietary_tags", []),
             source=payload.get("source", "user_submitted")
-        )
\ No newline at end of file
+        )
+
+# Column order expected by Recipe.from_row_positional (matches the dataclass fields)
+RECIPE_COLUMNS = tuple(f.name for f in fields(Recipe))
+
+# Column order expected by Recipe.from_search_row (list view, no instructions)
+SEARCH_COLUMNS = tuple(column for column in RECIPE_COLUMNS if column != "instructions")
@@ -6,9 +6,9 @@ Represents a user/session for pantry and search logs.
 
 from dataclasses import dataclass, asdict
 from typing import Optional, Dict, Any
-import json
+import orjson
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: Optional[int] = None
     session_id: str = ""
@@ -23,7 +23,7 @@ class User:
             session_id=row["session_id"],
             created_at=row.get("created_at"),
             last_active=row.get("last_active"),
-            preferences=json.loads(row["preferences"]) if row.get("preferences") else None
+            preferences=orjson.loads(row["preferences"]) if row.get("preferences") else None
         )
     def to_dict(self) -> dict:
         data = asdict(self)
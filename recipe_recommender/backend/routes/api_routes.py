@@ -4,40 +4,59 @@ API Routes
 Generic API endpoints (non-pantry)
 """
 
-from flask import Blueprint, request, jsonify
-from recipe_recommender.backend.database import get_recipe_by_id
-from recipe_recommender.backend.models.recipe import Recipe
-from recipe_recommender.backend.services.recipe_service import RecipeService
-from recipe_recommender.backend.services.ai_service import AIRecipeService
-from recipe_recommender.backend.config import Config
-
-import json
+import orjson
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from recipe_recommender.backend.database import get_recipe_model, suggest_ingredient_names
 
 api_bp = Blueprint('api', __name__)
 
 # Single recipe fetch
 @api_bp.route('/recipes/<int:recipe_id>', methods=['GET'])
 def get_recipe(recipe_id):
-    recipe = get_recipe_by_id(recipe_id)
+    recipe = get_recipe_model(recipe_id)
     if not recipe:
         return jsonify({'error': 'Recipe not found'}), 404
-    return jsonify(Recipe.from_row(recipe).to_dict())
+    return jsonify(recipe.to_dict())
 
 # Ingredient auto-suggestions
 @api_bp.route('/ingredients/suggest', methods=['GET'])
 def suggest_ingredients():
-    query = request.args.get('q', '').lower().strip()
-    # Use database directly for common_ingredients search
-    with get_db_connection() as conn:
-        rows = conn.execute('SELECT name FROM common_ingredients WHERE name LIKE ? LIMIT 10', (f'%{query}%',)).fetchall()
-        suggestions = [row['name'] for row in rows]
+    query = request.args.get('q', '').strip()
+    suggestions = suggest_ingredient_names(query, limit=10)
     return jsonify({'suggestions': suggestions})
 
-# Popular ingredients analytics
-@api_bp.route('/analytics/popular-ingredients', methods=['GET'])
-def popular_ingredients():
-    service = RecipeService()
-    return jsonify({'popular_ingredients': service.get_popular_ingredients()})
+# Streamed AI recipe suggestions: one JSON object per line as each recipe is generated
+@api_bp.route('/recipes/suggest/stream', methods=['POST'])
+def stream_recipe_suggestions():
+    data = request.get_json(silent=True) or {}
+    ingredients = [item for item in data.get('ingredients') or [] if isinstance(item, str)]
+    ingredients = ingredients[:current_app.config['MAX_INGREDIENTS_PER_SEARCH']]
+    if not ingredients:
+        return jsonify({'error': 'Ingredients list is required'}), 400
+    
+    # Validate up front: errors raised inside the stream would truncate a 200 response
+    cuisine_preference = data.get('cuisine_preference', 'any')
+    dietary_restrictions = data.get('dietary_restrictions') or []
+    if not isinstance(cuisine_preference, str):
+        return jsonify({'error': 'cuisine_preference must be a string'}), 400
+    if not isinstance(dietary_restrictions, list) or not all(isinstance(item, str) for item in dietary_restrictions):
+        return jsonify({'error': 'dietary_restrictions must be a list of strings'}), 400
+    try:
+        difficulty = min(max(int(data.get('difficulty', 3)), 1), 5)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'difficulty must be an integer'}), 400
+    
+    suggestions = current_app.ai_service.stream_recipe_suggestions(
+        ingredients,
+        cuisine_preference=cuisine_preference,
+        dietary_restrictions=dietary_restrictions,
+        difficulty=difficulty
+    )
+    lines = (orjson.dumps(suggestion) + b'\n' for suggestion in suggestions)
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+# Popular ingredients analytics is served by the app factory from a
+# background-refreshed payload (see create_app)
 
 # Ingredient substitution suggestions (AI powered)
 @api_bp.route('/ingredients/substitute', methods=['GET'])
@@ -46,6 +65,18 @@ def ingredient_substitute():
     cuisine = request.args.get('cuisine', 'global')
     if not ingredient:
         return jsonify({'error': 'Missing ingredient parameter'}), 400
-    ai_service = AIRecipeService(Config.GEMINI_API_KEY)
-    substitutions = ai_service.get_ingredient_substitutions(ingredient, cuisine)
-    return jsonify({'ingredient': ingredient, 'substitutions': substitutions})
\ No newline at end of file
+    # Reuse the app-wide client (and its response cache and rate limiter)
+    substitutions = current_app.ai_service.get_ingredient_substitutions(ingredient, cuisine)
+    return jsonify({'ingredient': ingredient, 'substitutions': substitutions})
+
+# Substitutions for several ingredients in one AI call
+@api_bp.route('/ingredients/substitute/bulk', methods=['POST'])
+def ingredient_substitute_bulk():
+    data = request.get_json(silent=True) or {}
+    ingredients = [item.strip() for item in data.get('ingredients') or [] if isinstance(item, str) and item.strip()]
+    ingredients = ingredients[:current_app.config['MAX_INGREDIENTS_PER_SEARCH']]
+    cuisine = data.get('cuisine', 'global')
+    if not ingredients:
+        return jsonify({'error': 'Ingredients list is required'}), 400
+    substitutions = current_app.ai_service.get_ingredient_substitutions_bulk(ingredients, cuisine)
+    return jsonify({'substitutions': substitutions})
@@ -4,28 +4,44 @@ Pantry Routes
 API endpoints for managing a user's pantry.
 """
 
-from flask import Blueprint, request, jsonify
-from recipe_recommender.backend.services.pantry_service import PantryService
+from flask import Blueprint, request, jsonify, current_app
 
 pantry_bp = Blueprint('pantry', __name__)
-service = PantryService()
 
-def _get_uid():
-    # Simple: get user id from query or json; in real use, use session or auth
-    return int(request.args.get('user_id') or request.json.get('user_id'))
+def _service():
+    # PantryService is built once by the app factory and shared by every request
+    return current_app.pantry_service
+
+def _missing_user():
+    return jsonify({'error': 'Missing or invalid user_id'}), 400
+
+def _ingredient_name(data):
+    name = data.get('ingredient_name')
+    return name.strip() if isinstance(name, str) else ''
+
+def _missing_ingredient():
+    return jsonify({'error': 'Missing or invalid ingredient_name'}), 400
 
 @pantry_bp.route('/', methods=['GET'])
 def get_pantry():
-    user_id = int(request.args.get('user_id'))
-    return jsonify({'pantry': service.get_pantry(user_id)})
+    user_id = request.args.get('user_id', type=int)
+    if user_id is None:
+        return _missing_user()
+    return jsonify({'pantry': _service().get_pantry(user_id)})
 
 @pantry_bp.route('/add', methods=['POST'])
 def add_item():
-    data = request.get_json()
-    user_id = int(data['user_id'])
-    item = service.add_or_update_item(
+    data = request.get_json(silent=True) or {}
+    try:
+        user_id = int(data['user_id'])
+    except (KeyError, TypeError, ValueError):
+        return _missing_user()
+    ingredient_name = _ingredient_name(data)
+    if not ingredient_name:
+        return _missing_ingredient()
+    item = _service().add_or_update_item(
         user_id,
-        data['ingredient_name'],
+        ingredient_name,
         data.get('quantity'),
         data.get('unit'),
         data.get('expiry_date')
@@ -34,14 +50,22 @@ def add_item():
 
 @pantry_bp.route('/remove', methods=['POST'])
 def remove_item():
-    data = request.get_json()
-    user_id = int(data['user_id'])
-    ok = service.remove_item(user_id, data['ingredient_name'])
+    data = request.get_json(silent=True) or {}
+    try:
+        user_id = int(data['user_id'])
+    except (KeyError, TypeError, ValueError):
+        return _missing_user()
+    ingredient_name = _ingredient_name(data)
+    if not ingredient_name:
+        return _missing_ingredient()
+    ok = _service().remove_item(user_id, ingredient_name)
     return jsonify({'success': ok})
 
 @pantry_bp.route('/expiring', methods=['GET'])
 def expiring():
-    user_id = int(request.args.get('user_id'))
-    days = int(request.args.get('days', 3))
-    items = service.get_expiring_items(user_id, days)
-    return jsonify({'expiring': items})
\ No newline at end of file
+    user_id = request.args.get('user_id', type=int)
+    if user_id is None:
+        return _missing_user()
+    days = request.args.get('days', 3, type=int)
+    items = _service().get_expiring_items(user_id, days)
+    return jsonify({'expiring': items})
@@ -14,20 +14,311 @@ Features:
 
 import json
 import logging
+import random
+import sys
+import threading
 import time
-from typing import List, Dict, Optional, Any
-import re
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Callable, Iterable, Iterator
 from dataclasses import dataclass
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+import orjson
 import os
-from functools import wraps
+import requests
+from functools import lru_cache, wraps
+from operator import attrgetter
+from types import MappingProxyType
 import hashlib
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Ingredient groups used to pick fallback recipes
+_FALLBACK_PROTEINS = frozenset({'chicken', 'beef', 'lamb', 'fish'})
+_FALLBACK_STIR_FRY_VEGETABLES = frozenset({'onions', 'tomatoes', 'carrots', 'potatoes'})
+_FALLBACK_CURRY_VEGETABLES = frozenset({'tomatoes', 'onions', 'carrots', 'potatoes', 'spinach', 'mushrooms'})
+_FALLBACK_LEGUMES = frozenset({'beans', 'lentils', 'fava beans'})
+
+# Fallback recipe templates; per-call values are filled in by _get_fallback_suggestions
+_STIR_FRY_FALLBACK = MappingProxyType({
+    'name': '{protein_title} and Vegetable Stir-fry',
+    'instructions': '1. Cut {protein} and vegetables into bite-sized pieces. 2. Heat oil in a large pan. 3. Cook {protein} until browned. 4. Add vegetables and stir-fry until tender. 5. Season with salt and pepper. 6. Serve hot.',
+    'cuisine_type': 'global',
+    'difficulty_level': 2,
+    'cook_time_minutes': 25,
+    'serving_size': 4,
+    'dietary_tags': '["quick", "one-pan"]',
+    'source': 'fallback',
+    'confidence_score': 0.6
+})
+_STIR_FRY_EXTRAS = ('oil', 'salt', 'pepper')
+
+_CURRY_FALLBACK = MappingProxyType({
+    'name': 'Mixed Vegetable Curry',
+    'instructions': '1. Heat oil in a pot. 2. Add cumin and let it splutter. 3. Add chopped vegetables. 4. Add turmeric and salt. 5. Cover and cook until vegetables are tender. 6. Serve with rice or bread.',
+    'difficulty_level': 2,
+    'cook_time_minutes': 30,
+    'serving_size': 4,
+    'dietary_tags': '["vegetarian", "vegan"]',
+    'source': 'fallback',
+    'confidence_score': 0.6
+})
+_CURRY_EXTRAS = ('oil', 'cumin', 'turmeric', 'salt')
+_CURRY_CUISINES = frozenset({'sudanese', 'indian'})
+
+_BEAN_STEW_FALLBACK = MappingProxyType({
+    'name': 'Simple Sudanese Bean Stew',
+    'ingredients': ('beans', 'onions', 'tomatoes', 'oil', 'cumin', 'salt'),
+    'instructions': '1. Soak beans overnight if dried. 2. Cook beans until tender. 3. In another pot, fry onions in oil. 4. Add tomatoes and cook until soft. 5. Add cooked beans, cumin, and salt. 6. Simmer for 15 minutes. 7. Serve with bread.',
+    'cuisine_type': 'sudanese',
+    'difficulty_level': 2,
+    'cook_time_minutes': 45,
+    'serving_size': 6,
+    'dietary_tags': '["vegetarian", "high-protein", "traditional"]',
+    'source': 'fallback',
+    'confidence_score': 0.7
+})
+
+# Static instructions for recipe generation, sent as the model's system
+# instruction. Kept byte-identical across requests (no interpolation) so the
+# shared prefix can be served from Gemini's context cache.
+_RECIPE_SYSTEM_INSTRUCTION = """You are an expert chef specializing in creating recipes from available ingredients.
+
+For every request:
+- Create practical recipes using primarily the available ingredients
+- Include cooking time and serving size
+- Provide clear, step-by-step instructions
+
+RESPONSE FORMAT (JSON only):
+{
+  "recipes": [
+    {
+      "name": "Recipe Name",
+      "ingredients": ["ingredient1", "ingredient2", ...],
+      "instructions": "Step-by-step cooking instructions",
+      "cuisine_type": "the requested cuisine",
+      "difficulty": 3,
+      "cook_time_minutes": 30,
+      "servings": 4,
+      "dietary_tags": ["tag1", "tag2"],
+      "tips": "Optional cooking tips or cultural notes"
+    }
+  ]
+}
+
+Important: Respond with valid JSON only. No additional text or formatting."""
+
+# Per-request part of the recipe prompt, filled in by _create_recipe_prompt
+_RECIPE_PROMPT_TEMPLATE = """INGREDIENTS AVAILABLE: {ingredients}
+
+REQUIREMENTS:
+- Create 3 unique, practical recipes using primarily these ingredients
+- Recipes should be {complexity}
+- {cuisine} cuisine preference{dietary_text}
+- Use "cuisine_type": "{cuisine_type}" and "difficulty": {difficulty}
+
+{cultural_context}"""
+
+# Several ingredient sets sharing cuisine, restrictions and difficulty in one call
+_BULK_RECIPE_PROMPT_TEMPLATE = """You are an expert chef specializing in creating recipes from available ingredients.
+
+Handle each numbered ingredient set below independently.
+
+INGREDIENT SETS:
+{ingredient_sets}
+
+REQUIREMENTS (for every set):
+- Create 3 unique, practical recipes using primarily that set's ingredients
+- Recipes should be {complexity}
+- {cuisine} cuisine preference{dietary_text}
+- Include cooking time and serving size
+- Provide clear, step-by-step instructions
+
+{cultural_context}
+
+RESPONSE FORMAT (JSON only), one entry per ingredient set:
+{{
+  "sets": [
+    {{
+      "set": 1,
+      "recipes": [
+        {{
+          "name": "Recipe Name",
+          "ingredients": ["ingredient1", "ingredient2", ...],
+          "instructions": "Step-by-step cooking instructions",
+          "cuisine_type": "{cuisine_type}",
+          "difficulty": {difficulty},
+          "cook_time_minutes": 30,
+          "servings": 4,
+          "dietary_tags": ["tag1", "tag2"],
+          "tips": "Optional cooking tips or cultural notes"
+        }}
+      ]
+    }}
+  ]
+}}
+
+Important: Respond with valid JSON only. No additional text or formatting."""
+
+# Substitutions for several ingredients in one call
+_BULK_SUBSTITUTIONS_PROMPT_TEMPLATE = """Suggest 3-5 common substitutions for each of these ingredients in {cuisine_type} cooking: {ingredients}
+
+Consider:
+- Similar flavor profile
+- Similar cooking properties
+- Common availability
+- Cultural appropriateness for {cuisine_type} cuisine
+
+Respond with JSON only, keyed by each ingredient exactly as listed:
+{{"substitutions": {{"ingredient1": ["substitute1", "substitute2", ...], "ingredient2": [...]}}}}"""
+
+_COMPLEXITY_GUIDE = MappingProxyType({
+    1: "very simple with minimal cooking steps",
+    2: "simple with basic cooking techniques",
+    3: "moderate complexity with standard techniques",
+    4: "advanced with multiple techniques",
+    5: "expert level with complex techniques"
+})
+
+# Cuisine-specific prompt context; other cuisines get a generic "authentic" line
+_CULTURAL_CONTEXTS = MappingProxyType({
+    "any": "",
+    "sudanese": """
+Focus on authentic Sudanese cuisine with traditional ingredients and cooking methods.
+Include cultural context and traditional serving suggestions. Consider ingredients
+like sorghum, fava beans, peanuts, sesame, tamarind, and traditional spices like
+cardamom, cinnamon, and coriander. Mention traditional accompaniments.
+""",
+})
+
+# Offline substitutions used when the Gemini call fails
+_COMMON_SUBSTITUTIONS = MappingProxyType({
+    'chicken': ('turkey', 'tofu', 'tempeh', 'mushrooms'),
+    'beef': ('lamb', 'pork', 'lentils', 'mushrooms'),
+    'butter': ('oil', 'margarine', 'coconut oil', 'ghee'),
+    'milk': ('coconut milk', 'almond milk', 'soy milk', 'water'),
+    'eggs': ('flax eggs', 'chia eggs', 'applesauce', 'banana'),
+    'flour': ('rice flour', 'almond flour', 'coconut flour', 'oat flour')
+})
+
+def _loads(text: str) -> Any:
+    """Parse JSON with orjson, falling back to stdlib json for inputs orjson rejects (e.g. NaN)"""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json.loads(text)
+
+def _extract_json(text: str) -> str:
+    """
+    Slice the outermost {...} object out of a model response
+    
+    Same result as re.search(r'\{.*\}', text, re.DOTALL) (first '{' to last
+    '}'), found with two string scans instead of a backtracking regex.
+    """
+    start = text.find('{')
+    end = text.rfind('}')
+    if start >= 0 and end > start:
+        return text[start:end + 1]
+    return text
+
+def _normalize_terms(values: Optional[Iterable[str]]) -> List[str]:
+    """Strip and lowercase each term in one pass, dropping blanks"""
+    return [term for term in (value.strip().lower() for value in values or ()) if term]
+
+@lru_cache(maxsize=4096)
+def _singular_key(term: str) -> bytes:
+    """
+    Cache-key form of an ingredient: last word crudely singularized
+    
+    "tomatoes"/"tomato" and "fava beans"/"fava bean" share a key, so
+    plural variations of the same request reuse one Gemini answer. Only
+    used for keys; prompts keep the user's wording.
+    """
+    head, _, word = term.rpartition(' ')
+    if len(word) > 3 and not word.endswith('ss'):
+        if word.endswith('ies'):
+            word = word[:-3] + 'y'
+        elif word.endswith('oes'):
+            word = word[:-2]
+        elif word.endswith('s'):
+            word = word[:-1]
+    return f"{head} {word}".encode() if head else word.encode()
+
+def _cuisine_prompt_fields(cuisine_preference: str, difficulty: int) -> Dict[str, Any]:
+    """Prompt fields that depend only on cuisine and difficulty"""
+    # Cuisine-specific context (detailed brief for Sudanese cuisine)
+    cultural_context = _CULTURAL_CONTEXTS.get(cuisine_preference)
+    if cultural_context is None:
+        cultural_context = f"Focus on authentic {cuisine_preference} cuisine with traditional flavors and techniques."
+    
+    return dict(
+        complexity=_COMPLEXITY_GUIDE.get(difficulty, "moderate complexity"),
+        cuisine=cuisine_preference.title(),
+        cultural_context=cultural_context,
+        cuisine_type=cuisine_preference,
+        difficulty=difficulty
+    )
+
+@lru_cache(maxsize=256)
+def _specialized_recipe_prompt(cuisine_preference: str, difficulty: int) -> str:
+    """
+    Recipe prompt template with the cuisine/difficulty parts baked in
+    
+    Only {ingredients} and {dietary_text} are left as placeholders; the
+    baked-in values are brace-escaped so user cuisine text cannot inject
+    format fields.
+    """
+    fields = {key: str(value).replace('{', '{{').replace('}', '}}')
+              for key, value in _cuisine_prompt_fields(cuisine_preference, difficulty).items()}
+    return _RECIPE_PROMPT_TEMPLATE.format(ingredients='{ingredients}', dietary_text='{dietary_text}', **fields)
+
+# Specialize the common combinations up-front; other cuisines fill the cache on first use
+for _cuisine in _CULTURAL_CONTEXTS:
+    for _difficulty in _COMPLEXITY_GUIDE:
+        _specialized_recipe_prompt(_cuisine, _difficulty)
+del _cuisine, _difficulty
+
+_DECODER = json.JSONDecoder()
+
+def _iter_recipe_objects(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse a streamed {"recipes": [...]} response
+    
+    Yields each object of the "recipes" array as soon as its closing brace
+    has arrived, so callers can use the first recipe while the rest is
+    still being generated.
+    """
+    buffer = ''
+    pos = None  # Offset just past the last consumed array element
+    for chunk in chunks:
+        buffer += chunk
+        if pos is None:
+            key = buffer.find('"recipes"')
+            bracket = buffer.find('[', key) if key >= 0 else -1
+            if bracket < 0:
+                continue
+            pos = bracket + 1
+        
+        while True:
+            start = buffer.find('{', pos)
+            if start < 0:
+                break
+            if ']' in buffer[pos:start]:
+                return  # End of the recipes array
+            try:
+                obj, pos = _DECODER.raw_decode(buffer, start)
+            except json.JSONDecodeError:
+                break  # Element not complete yet; wait for more text
+            yield obj
+        
+        # Drop consumed text so each chunk only rescans the unfinished element
+        buffer = buffer[pos:]
+        pos = 0
+
+@dataclass(slots=True, frozen=True)
 class RecipeSuggestion:
-    """Data class for structured recipe suggestions"""
+    """Data class for structured recipe suggestions (immutable: instances are shared through the cache)"""
     name: str
     ingredients: List[str]
     instructions: str
@@ -35,42 +326,205 @@ class RecipeSuggestion:
     difficulty: int = 3
     cook_time: int = 30
     servings: int = 4
-    dietary_tags: List[str] = None
+    dietary_tags: tuple = ()
     confidence_score: float = 0.8
 
 class RateLimiter:
-    """Simple rate limiter for Gemini API calls"""
+    """Thread-safe sliding-window rate limiter for Gemini API calls"""
+    
+    WINDOW_SECONDS = 60.0
     
     def __init__(self, max_calls_per_minute=20):
         self.max_calls = max_calls_per_minute
-        self.calls = []
+        # Monotonic timestamps of calls inside the window; never holds more than max_calls
+        self.calls = deque(maxlen=max_calls_per_minute)
+        self._lock = threading.Lock()
         
     def wait_if_needed(self):
         """Wait if rate limit would be exceeded"""
-        now = time.time()
-        # Remove calls older than 1 minute
-        self.calls = [call_time for call_time in self.calls if now - call_time < 60]
-        
-        if len(self.calls) >= self.max_calls:
-            sleep_time = 60 - (now - self.calls[0]) + 1
-            if sleep_time > 0:
-                logger.info(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # Expire calls that have left the window (O(1) amortized)
+                while self.calls and now - self.calls[0] >= self.WINDOW_SECONDS:
+                    self.calls.popleft()
+                
+                if len(self.calls) < self.max_calls:
+                    self.calls.append(now)
+                    return
+                
+                sleep_time = self.WINDOW_SECONDS - (now - self.calls[0])
+            
+            # Sleep without the lock, then re-check: another thread may have taken the slot
+            logger.info("Rate limiting: sleeping for %.2f seconds", sleep_time)
+            time.sleep(sleep_time)
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket rate limiter for Gemini API calls
+    
+    O(1) state (token count and last refill time) regardless of traffic;
+    allows bursts up to capacity, then admits calls at the average rate.
+    """
+    
+    def __init__(self, max_calls_per_minute=20, capacity=None):
+        self.max_calls = max_calls_per_minute
+        self.rate = max_calls_per_minute / 60.0  # Tokens added per second
+        self.capacity = capacity or max_calls_per_minute
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def wait_if_needed(self):
+        """Wait if rate limit would be exceeded"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            # Reserve a token up front; a deficit queues callers in arrival order
+            self.tokens -= 1
+            sleep_time = -self.tokens / self.rate if self.tokens < 0 else 0.0
         
-        self.calls.append(now)
+        if sleep_time > 0:
+            logger.info("Rate limiting: sleeping for %.2f seconds", sleep_time)
+            time.sleep(sleep_time)
+
+class RequestCoalescer:
+    """
+    Micro-batcher: collects requests arriving within a short window and
+    answers them with one call to a batch handler
+    
+    A batch is dispatched when the window elapses (on a timer thread) or as
+    soon as it reaches max_batch (on the submitting thread).
+    """
+    
+    def __init__(self, handler: Callable[[List[Any]], List[Any]], window: float = 0.05, max_batch: int = 16):
+        self._handler = handler
+        self._window = window
+        self._max_batch = max_batch
+        self._pending = []  # (request, Future) in arrival order
+        self._timer = None
+        self._lock = threading.Lock()
+    
+    def submit(self, request: Any) -> Future:
+        """Queue a request; the future resolves to its entry of the handler's result"""
+        future = Future()
+        batch = None
+        with self._lock:
+            self._pending.append((request, future))
+            if len(self._pending) >= self._max_batch:
+                batch = self._take()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._run(batch)
+        return future
+    
+    def _take(self):
+        """Detach the pending batch (caller holds the lock)"""
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+    
+    def _flush(self):
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._run(batch)
+    
+    def _run(self, batch):
+        try:
+            results = self._handler([request for request, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+# Transient Gemini errors worth retrying (quota/429, timeouts and server-side failures);
+# auth and invalid-request errors are permanent and fail fast. With the REST
+# transport, client-side timeouts and connection resets surface from requests.
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.GatewayTimeout,
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+)
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Server-suggested retry delay in seconds, if the error carries one"""
+    delay = getattr(error, 'retry_delay', None)
+    if delay is None:
+        # google.rpc.RetryInfo travels in the error details
+        for detail in getattr(error, 'details', None) or ():
+            delay = getattr(detail, 'retry_delay', None)
+            if delay is not None:
+                break
+    if delay is None:
+        return None
+    if hasattr(delay, 'total_seconds'):
+        return delay.total_seconds()
+    if hasattr(delay, 'seconds'):
+        return delay.seconds + getattr(delay, 'nanos', 0) / 1e9
+    try:
+        return float(delay)
+    except (TypeError, ValueError):
+        return None
+
+# Dietary tags the model commonly returns, interned so every recipe shares one string object
+_INTERNED_TAGS = MappingProxyType({tag: sys.intern(tag) for tag in (
+    'vegetarian', 'vegan', 'gluten-free', 'dairy-free', 'halal', 'quick',
+    'one-pan', 'high-protein', 'traditional', 'spicy', 'healthy',
+)})
+
+# Required keys of each recipe object in a Gemini response
+_REQUIRED_RECIPE_KEYS = frozenset({'name', 'ingredients', 'instructions'})
 
-def retry_on_failure(max_retries=3, delay=1):
-    """Decorator for retrying failed API calls"""
+# Numeric recipe fields: (response key, default, minimum, maximum, RecipeSuggestion field)
+_CLAMPED_FIELDS = (
+    ('difficulty', 3, 1, 5, 'difficulty'),
+    ('cook_time_minutes', 30, 5, 10_000, 'cook_time'),
+    ('servings', 4, 1, 100, 'servings'),
+)
+
+# RecipeSuggestion fields in _suggestion_to_dict order, fetched in one call
+_SUGGESTION_FIELDS = attrgetter(
+    'name', 'ingredients', 'instructions', 'cuisine_type', 'difficulty',
+    'cook_time', 'servings', 'dietary_tags', 'confidence_score'
+)
+
+def retry_on_failure(max_retries=3, base=1, cap=30):
+    """
+    Decorator for retrying failed API calls
+    
+    Retryable errors back off exponentially with full jitter
+    (uniform(0, min(cap, base * 2**attempt))) so concurrent workers do not
+    retry in lockstep; a server-provided retry delay takes precedence.
+    Other errors are re-raised immediately.
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
             for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
-                except Exception as e:
+                except RETRYABLE_ERRORS as e:
                     if attempt == max_retries - 1:
                         raise
-                    logger.warning(f"Attempt {attempt + 1} failed: {e}. Retrying in {delay}s...")
+                    delay = _retry_after(e)
+                    if delay is None:
+                        delay = random.uniform(0, min(cap, base * 2 ** attempt))
+                    delay = min(cap, delay)
+                    logger.warning("Attempt %s failed: %s. Retrying in %.2fs...", attempt + 1, e, delay)
                     time.sleep(delay)
             return None
         return wrapper
@@ -81,45 +535,203 @@ class AIRecipeService:
     AI-powered recipe recommendation service using Gemini API
     """
     
-    def __init__(self, api_key: str = None, model: str = "gemini-2.0-flash"):
+    def __init__(self, api_key: str = None, model: str = "gemini-2.0-flash", timeout: float = 15.0,
+                 l2_cache=None, l2_timeout: int = 604800, max_concurrency: int = None,
+                 rate_limit_per_minute: int = 15, rate_limiter: str = "bucket", cache_size: int = 100,
+                 batch_window: float = 0.0, batch_max: int = 16):
         """
         Initialize AI service with Gemini configuration
         Args:
             api_key (str): Gemini API key (optional, will use env if not provided)
             model (str): Gemini model to use (default: gemini-2.0-flash)
+            timeout (float): Per-request timeout in seconds for Gemini calls
+            l2_cache: Optional shared cache (get/set with timeout, e.g. Flask-Caching)
+                that keeps AI responses across restarts and workers
+            l2_timeout (int): Lifetime in seconds of entries in the shared cache
+            max_concurrency (int): Most Gemini calls in flight for fanned-out requests
+                (default: the per-minute rate limit)
+            rate_limit_per_minute (int): Gemini calls allowed per minute
+            rate_limiter (str): "bucket" (token bucket, allows short bursts) or
+                "window" (sliding window, strict per-minute cap)
+            cache_size (int): Entries kept in the in-process LRU of AI responses
+            batch_window (float): Seconds to collect concurrent uncached requests into
+                one bulk Gemini call (0 disables coalescing)
+            batch_max (int): Most requests coalesced into one call
         """
         # Fetch Gemini API key from env if not provided
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("Valid Gemini API key required. Set GEMINI_API_KEY in your environment.")
-        genai.configure(api_key=self.api_key)
+        # REST transport reuses one pooled keep-alive HTTPS session for every call
+        # (and, unlike gRPC, cooperates with gevent's patched sockets)
+        genai.configure(api_key=self.api_key, transport="rest")
         self.model = model  # Typically "gemini-2.0-flash" or similar
+        # Reused model handles (see set_model); recipe prompts carry the static system instruction
+        self._model = genai.GenerativeModel(model)
+        self._recipe_model = genai.GenerativeModel(model, system_instruction=_RECIPE_SYSTEM_INSTRUCTION)
+        self.request_options = {"timeout": timeout}
 
-        self.rate_limiter = RateLimiter(max_calls_per_minute=15)  # Conservative limit
+        limiter_class = RateLimiter if rate_limiter == "window" else TokenBucketRateLimiter
+        self.rate_limiter = limiter_class(max_calls_per_minute=rate_limit_per_minute)
+        
+        # Fan-out pool for batched requests (created on first use)
+        self.max_concurrency = max_concurrency or self.rate_limiter.max_calls
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        
+        # Concurrent uncached requests share one bulk call (see get_recipe_suggestions_coalesced)
+        self._coalescer = None
+        if batch_window > 0:
+            self._coalescer = RequestCoalescer(self.get_recipe_suggestions_bulk, batch_window, batch_max)
 
-        # Cache for repeated queries (simple in-memory cache)
-        self._cache = {}
-        self._cache_max_size = 100
+        # LRU cache for repeated queries (most recently used entries at the end)
+        self._cache = OrderedDict()
+        self._cache_max_size = cache_size
+        self._cache_lock = threading.Lock()
+        self._cache_stats = Counter()  # l1_hits / l2_hits / misses, under _cache_lock
+        
+        # LRU of AI substitutions keyed by (ingredient, cuisine), shares _cache_lock
+        self._substitutions_cache = OrderedDict()
+        self._substitutions_cache_max_size = 500
+        
+        # Requests Gemini recently answered with no usable recipe: key -> expiry
+        # (monotonic). A fixed TTL keeps insertion order == expiry order.
+        self._negative_cache = OrderedDict()
+        self._negative_cache_max_size = 200
+        self._negative_cache_ttl = 60.0
+        
+        # Second tier behind the in-process LRU (None disables it)
+        self._l2 = l2_cache
+        self._l2_timeout = l2_timeout
 
-        logger.info(f"AI Recipe Service initialized with Gemini model: {model}")
+        logger.info("AI Recipe Service initialized with Gemini model: %s", model)
+    
+    def set_model(self, model: str):
+        """
+        Switch to a different Gemini model, rebuilding the cached model handles
+        
+        Args:
+            model (str): Gemini model name
+        """
+        self._model = genai.GenerativeModel(model)
+        self._recipe_model = genai.GenerativeModel(model, system_instruction=_RECIPE_SYSTEM_INSTRUCTION)
+        self.model = model
+        logger.info("AI Recipe Service switched to Gemini model: %s", model)
     
-    def _generate_cache_key(self, ingredients: List[str], cuisine: str, dietary: List[str]) -> str:
+    def _generate_cache_key(self, ingredients: List[str], cuisine: str, dietary: List[str]) -> bytes:
         """Generate cache key for request deduplication"""
-        key_data = f"{sorted(ingredients)}_{cuisine}_{sorted(dietary or [])}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+        # Canonical bytes (sorted, NUL-joined) hashed with BLAKE2b; no repr/f-string building.
+        # Ingredients are deduplicated after singularizing so near-duplicate sets collide.
+        key_data = b"|".join((
+            b"\0".join(sorted({_singular_key(ingredient) for ingredient in ingredients})),
+            cuisine.encode(),
+            b"\0".join(sorted(restriction.encode() for restriction in dietary or ())),
+        ))
+        return hashlib.blake2b(key_data, digest_size=16).digest()  # Raw 16-byte digest; hex only for the shared tier
     
-    def _get_cached_result(self, cache_key: str) -> Optional[List[RecipeSuggestion]]:
-        """Get cached result if available"""
-        return self._cache.get(cache_key)
+    def _get_cached_result(self, cache_key: bytes) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get cached result if available, marking it most recently used
+        
+        Returns the suggestions already converted to dictionary format; these
+        are shared, so callers hand out copies.
+        """
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+            if entry is not None:
+                self._cache.move_to_end(cache_key)
+                self._cache_stats['l1_hits'] += 1
+                return entry[1]
+            if self._l2 is None:
+                self._cache_stats['misses'] += 1
+                return None
+        
+        l2_key = f"ai:{cache_key.hex()}"
+        try:
+            raw = self._l2.get(l2_key)
+        except Exception as e:
+            logger.warning("AI cache lookup failed: %s", e)
+            raw = None
+        
+        result = None
+        if raw:
+            # A corrupt or outdated entry (e.g. from before a RecipeSuggestion change) is a miss
+            try:
+                result = [RecipeSuggestion(**data) for data in orjson.loads(raw)]
+            except Exception as e:
+                logger.warning("Discarding unreadable AI cache entry %s: %s", l2_key, e)
+                try:
+                    self._l2.delete(l2_key)
+                except Exception as e:
+                    logger.warning("AI cache delete failed: %s", e)
+        
+        with self._cache_lock:
+            self._cache_stats['l2_hits' if result is not None else 'misses'] += 1
+        if result is None:
+            return None
+        
+        # Promote the shared entry into the local LRU
+        return self._cache_result(cache_key, result, write_through=False)
     
-    def _cache_result(self, cache_key: str, result: List[RecipeSuggestion]):
-        """Cache result with size management"""
-        if len(self._cache) >= self._cache_max_size:
-            # Remove oldest entry
-            oldest_key = next(iter(self._cache))
-            del self._cache[oldest_key]
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        AI response cache counters for observability
         
-        self._cache[cache_key] = result
+        Returns:
+            dict: Hits per tier, misses, hit rate and current LRU size
+        """
+        with self._cache_lock:
+            stats = {
+                'l1_hits': self._cache_stats['l1_hits'],
+                'l2_hits': self._cache_stats['l2_hits'],
+                'misses': self._cache_stats['misses'],
+                'size': len(self._cache),
+            }
+        lookups = stats['l1_hits'] + stats['l2_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['l1_hits'] + stats['l2_hits']) / lookups if lookups else 0.0
+        return stats
+    
+    def _cache_result(self, cache_key: bytes, result: List[RecipeSuggestion],
+                      write_through: bool = True) -> List[Dict[str, Any]]:
+        """
+        Cache result, evicting the least recently used entry when full
+        
+        The dictionary form is stored next to the suggestions so cache hits
+        skip the conversion; it is returned for the caller's use.
+        """
+        dicts = [self._suggestion_to_dict(suggestion) for suggestion in result]
+        with self._cache_lock:
+            self._cache[cache_key] = (result, dicts)
+            self._cache.move_to_end(cache_key)
+            if len(self._cache) > self._cache_max_size:
+                self._cache.popitem(last=False)
+        
+        if write_through and self._l2 is not None:
+            try:
+                self._l2.set(
+                    f"ai:{cache_key.hex()}",
+                    orjson.dumps(result),  # orjson serializes (slotted) dataclasses natively
+                    timeout=self._l2_timeout
+                )
+            except Exception as e:
+                logger.warning("AI cache write failed: %s", e)
+        return dicts
+    
+    def _is_negative_cached(self, cache_key: bytes) -> bool:
+        """Whether this request recently produced no usable AI recipes"""
+        now = time.monotonic()
+        with self._cache_lock:
+            while self._negative_cache and next(iter(self._negative_cache.values())) <= now:
+                self._negative_cache.popitem(last=False)
+            return cache_key in self._negative_cache
+    
+    def _cache_negative(self, cache_key: bytes):
+        """Remember an empty AI answer so identical requests skip the API for a while"""
+        with self._cache_lock:
+            self._negative_cache.pop(cache_key, None)
+            self._negative_cache[cache_key] = time.monotonic() + self._negative_cache_ttl
+            if len(self._negative_cache) > self._negative_cache_max_size:
+                self._negative_cache.popitem(last=False)
     
     def _create_recipe_prompt(self, ingredients: List[str], cuisine_preference: str, 
                              dietary_restrictions: List[str], difficulty: int) -> str:
@@ -135,74 +747,51 @@ class AIRecipeService:
         Returns:
             str: Formatted prompt for Gemini
         """
+        dietary_text = f" The recipes must be {', '.join(dietary_restrictions)}." if dietary_restrictions else ""
+        return _specialized_recipe_prompt(cuisine_preference, difficulty).format(
+            ingredients=', '.join(ingredients),
+            dietary_text=dietary_text
+        )
+    
+    def _create_bulk_recipe_prompt(self, ingredient_sets: List[List[str]], cuisine_preference: str,
+                                   dietary_restrictions: List[str], difficulty: int) -> str:
+        """
+        Create one prompt asking for recipes for several ingredient sets
+        
+        Args:
+            ingredient_sets: Available ingredients of each request, numbered from 1
+            cuisine_preference: Preferred cuisine type
+            dietary_restrictions: List of dietary restrictions
+            difficulty: Cooking difficulty level (1-5)
+            
+        Returns:
+            str: Formatted prompt for Gemini
+        """
+        return _BULK_RECIPE_PROMPT_TEMPLATE.format(
+            ingredient_sets='\n'.join(
+                f"{number}. {', '.join(ingredients)}"
+                for number, ingredients in enumerate(ingredient_sets, 1)
+            ),
+            **self._prompt_fields(cuisine_preference, dietary_restrictions, difficulty)
+        )
+    
+    def _prompt_fields(self, cuisine_preference: str, dietary_restrictions: List[str],
+                       difficulty: int) -> Dict[str, Any]:
+        """Template fields shared by the single and bulk recipe prompts"""
         # Build dietary restrictions string
         dietary_text = ""
         if dietary_restrictions:
             dietary_text = f" The recipes must be {', '.join(dietary_restrictions)}."
         
-        # Adjust complexity based on difficulty
-        complexity_guide = {
-            1: "very simple with minimal cooking steps",
-            2: "simple with basic cooking techniques", 
-            3: "moderate complexity with standard techniques",
-            4: "advanced with multiple techniques",
-            5: "expert level with complex techniques"
-        }
-        
-        complexity = complexity_guide.get(difficulty, "moderate complexity")
-        
-        # Special handling for Sudanese cuisine
-        cultural_context = ""
-        if cuisine_preference == "sudanese":
-            cultural_context = """
-Focus on authentic Sudanese cuisine with traditional ingredients and cooking methods.
-Include cultural context and traditional serving suggestions. Consider ingredients
-like sorghum, fava beans, peanuts, sesame, tamarind, and traditional spices like
-cardamom, cinnamon, and coriander. Mention traditional accompaniments.
-"""
-        elif cuisine_preference != "any":
-            cultural_context = f"Focus on authentic {cuisine_preference} cuisine with traditional flavors and techniques."
-        
-        prompt = f"""You are an expert chef specializing in creating recipes from available ingredients.
-
-INGREDIENTS AVAILABLE: {', '.join(ingredients)}
-
-REQUIREMENTS:
-- Create 3 unique, practical recipes using primarily these ingredients
-- Recipes should be {complexity}
-- {cuisine_preference.title()} cuisine preference{dietary_text}
-- Include cooking time and serving size
-- Provide clear, step-by-step instructions
-
-{cultural_context}
-
-RESPONSE FORMAT (JSON only):
-{{
-  "recipes": [
-    {{
-      "name": "Recipe Name",
-      "ingredients": ["ingredient1", "ingredient2", ...],
-      "instructions": "Step-by-step cooking instructions",
-      "cuisine_type": "{cuisine_preference}",
-      "difficulty": {difficulty},
-      "cook_time_minutes": 30,
-      "servings": 4,
-      "dietary_tags": ["tag1", "tag2"],
-      "tips": "Optional cooking tips or cultural notes"
-    }}
-  ]
-}}
-
-Important: Respond with valid JSON only. No additional text or formatting."""
-        
-        return prompt
+        return dict(_cuisine_prompt_fields(cuisine_preference, difficulty), dietary_text=dietary_text)
     
-    @retry_on_failure(max_retries=2, delay=2)
-    def _call_gemini_api(self, prompt: str) -> str:
+    @retry_on_failure(max_retries=2)
+    def _call_gemini_api(self, prompt: str, model=None) -> str:
         """
         Make rate-limited call to Gemini API with error handling
         Args:
             prompt (str): Recipe generation prompt
+            model: Model handle to use (default: the plain model without system instruction)
         Returns:
             str: Gemini model text response
         Raises:
@@ -210,8 +799,7 @@ Important: Respond with valid JSON only. No additional text or formatting."""
         """
         self.rate_limiter.wait_if_needed()
         try:
-            model = genai.GenerativeModel(self.model)
-            response = model.generate_content(prompt)
+            response = (model or self._model).generate_content(prompt, request_options=self.request_options)
             if hasattr(response, 'text'):
                 return response.text
             elif response.parts:
@@ -219,9 +807,60 @@ Important: Respond with valid JSON only. No additional text or formatting."""
             else:
                 raise ValueError("No valid response from Gemini API.")
         except Exception as e:
-            logger.error(f"Error calling Gemini API: {e}")
+            logger.error("Error calling Gemini API: %s", e)
             raise
     
+    def _stream_gemini_api(self, prompt: str, model=None) -> Iterator[str]:
+        """
+        Make a rate-limited streaming call to Gemini API
+        
+        Unlike _call_gemini_api this is not retried: failures surface while
+        the caller iterates, possibly after some text was already consumed.
+        
+        Args:
+            prompt (str): Recipe generation prompt
+            model: Model handle to use (default: the plain model without system instruction)
+        Yields:
+            str: Response text chunks as they are generated
+        """
+        self.rate_limiter.wait_if_needed()
+        response = (model or self._model).generate_content(prompt, stream=True, request_options=self.request_options)
+        for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+    
+    def _build_suggestion(self, recipe_data: Dict[str, Any]) -> Optional[RecipeSuggestion]:
+        """
+        Validate one recipe object from a Gemini response
+        
+        Args:
+            recipe_data (dict): Decoded recipe object
+            
+        Returns:
+            RecipeSuggestion or None if the recipe is incomplete or malformed
+        """
+        try:
+            # Validate required fields
+            if not _REQUIRED_RECIPE_KEYS.issubset(recipe_data):
+                logger.warning("Skipping incomplete recipe: %s", recipe_data.get('name', 'Unknown'))
+                return None
+            
+            return RecipeSuggestion(
+                name=recipe_data['name'].strip(),
+                ingredients=[ing.strip().lower() for ing in recipe_data['ingredients']],
+                instructions=recipe_data['instructions'].strip(),
+                cuisine_type=recipe_data.get('cuisine_type', 'global'),
+                dietary_tags=tuple([_INTERNED_TAGS.get(tag, tag) for tag in recipe_data.get('dietary_tags', ())]),
+                confidence_score=0.8,  # AI-generated recipes get 0.8 confidence
+                # Clamp difficulty to 1-5, cook time and servings to sane ranges
+                **{field: min(high, max(low, recipe_data.get(key, default)))
+                   for key, default, low, high, field in _CLAMPED_FIELDS}
+            )
+            
+        except (KeyError, ValueError, TypeError) as e:
+            logger.warning("Error parsing recipe %s: %s", recipe_data.get('name', 'Unknown'), e)
+            return None
+    
     def _parse_ai_response(self, response_text: str) -> List[RecipeSuggestion]:
         """
         Parse and validate Gemini response into structured format
@@ -234,38 +873,15 @@ Important: Respond with valid JSON only. No additional text or formatting."""
         """
         try:
             # Clean response text (remove any non-JSON content)
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group()
+            response_text = _extract_json(response_text)
             
-            data = json.loads(response_text)
+            data = _loads(response_text)
             recipes_data = data.get('recipes', [])
             
-            suggestions = []
-            for recipe_data in recipes_data:
-                try:
-                    # Validate required fields
-                    if not all(key in recipe_data for key in ['name', 'ingredients', 'instructions']):
-                        logger.warning(f"Skipping incomplete recipe: {recipe_data.get('name', 'Unknown')}")
-                        continue
-                    
-                    suggestion = RecipeSuggestion(
-                        name=recipe_data['name'].strip(),
-                        ingredients=[ing.strip().lower() for ing in recipe_data['ingredients']],
-                        instructions=recipe_data['instructions'].strip(),
-                        cuisine_type=recipe_data.get('cuisine_type', 'global'),
-                        difficulty=max(1, min(5, recipe_data.get('difficulty', 3))),  # Clamp to 1-5
-                        cook_time=max(5, recipe_data.get('cook_time_minutes', 30)),  # Minimum 5 minutes
-                        servings=max(1, recipe_data.get('servings', 4)),  # Minimum 1 serving
-                        dietary_tags=recipe_data.get('dietary_tags', []),
-                        confidence_score=0.8  # AI-generated recipes get 0.8 confidence
-                    )
-                    
-                    suggestions.append(suggestion)
-                    
-                except (KeyError, ValueError, TypeError) as e:
-                    logger.warning(f"Error parsing recipe {recipe_data.get('name', 'Unknown')}: {e}")
-                    continue
+            suggestions = [
+                suggestion for suggestion in map(self._build_suggestion, recipes_data)
+                if suggestion is not None
+            ]
             
             if not suggestions:
                 logger.warning("No valid recipes parsed from AI response")
@@ -273,12 +889,12 @@ Important: Respond with valid JSON only. No additional text or formatting."""
             return suggestions
             
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse AI response as JSON: {e}")
-            logger.debug(f"Raw response: {response_text[:500]}...")
+            logger.error("Failed to parse AI response as JSON: %s", e)
+            logger.debug("Raw response: %.500s...", response_text)
             return []
         
         except Exception as e:
-            logger.error(f"Unexpected error parsing AI response: {e}")
+            logger.error("Unexpected error parsing AI response: %s", e)
             return []
     
     def get_recipe_suggestions(self, ingredients: List[str], 
@@ -302,8 +918,8 @@ Important: Respond with valid JSON only. No additional text or formatting."""
             return []
         
         # Validate and clean inputs
-        ingredients = [ing.strip().lower() for ing in ingredients if ing.strip()]
-        dietary_restrictions = dietary_restrictions or []
+        ingredients = _normalize_terms(ingredients)
+        dietary_restrictions = _normalize_terms(dietary_restrictions)
         
         if not ingredients:
             return []
@@ -313,46 +929,306 @@ Important: Respond with valid JSON only. No additional text or formatting."""
         cached_result = self._get_cached_result(cache_key)
         
         if cached_result:
-            logger.info(f"Returning cached AI recipe suggestions for ingredients: {ingredients}")
-            return [self._suggestion_to_dict(suggestion) for suggestion in cached_result]
+            logger.info("Returning cached AI recipe suggestions for ingredients: %s", ingredients)
+            # Copies: ranking adds a score to each returned dict
+            return [dict(suggestion) for suggestion in cached_result]
+        
+        if self._is_negative_cached(cache_key):
+            logger.info("Skipping AI call for recently unanswerable ingredients: %s", ingredients)
+            return self._get_fallback_suggestions(ingredients, cuisine_preference)
         
         try:
             # Generate prompt and call Gemini
             prompt = self._create_recipe_prompt(ingredients, cuisine_preference, dietary_restrictions, difficulty)
             
-            logger.info(f"Requesting AI recipe suggestions for: {ingredients}")
-            response_text = self._call_gemini_api(prompt)
+            logger.info("Requesting AI recipe suggestions for: %s", ingredients)
+            response_text = self._call_gemini_api(prompt, model=self._recipe_model)
 
             # Parse response
             suggestions = self._parse_ai_response(response_text)
 
-            # Cache successful results
-            if suggestions:
-                self._cache_result(cache_key, suggestions)
-                logger.info(f"Generated {len(suggestions)} AI recipe suggestions")
-            else:
+            # Cache successful results; empty answers are cached briefly as negatives
+            if not suggestions:
                 logger.warning("No valid suggestions generated by AI")
+                self._cache_negative(cache_key)
+                return self._get_fallback_suggestions(ingredients, cuisine_preference)
             
-            return [self._suggestion_to_dict(suggestion) for suggestion in suggestions]
+            dicts = self._cache_result(cache_key, suggestions)
+            logger.info("Generated %s AI recipe suggestions", len(suggestions))
+            return [dict(suggestion) for suggestion in dicts]
             
         except Exception as e:
-            logger.error(f"Failed to get AI recipe suggestions: {e}")
+            logger.error("Failed to get AI recipe suggestions: %s", e)
             # Return fallback suggestions for common ingredients
             return self._get_fallback_suggestions(ingredients, cuisine_preference)
     
+    def stream_recipe_suggestions(self, ingredients: List[str],
+                                  cuisine_preference: str = "any",
+                                  dietary_restrictions: List[str] = None,
+                                  difficulty: int = 3) -> Iterator[Dict[str, Any]]:
+        """
+        Stream AI recipe suggestions, yielding each recipe as soon as Gemini finishes it
+        
+        Same inputs, caching and fallbacks as get_recipe_suggestions; the full
+        list is cached once the stream completes.
+        
+        Yields:
+            Dict: Recipe suggestions in dictionary format
+        """
+        ingredients = _normalize_terms(ingredients)
+        dietary_restrictions = _normalize_terms(dietary_restrictions)
+        if not ingredients:
+            return
+        
+        cache_key = self._generate_cache_key(ingredients, cuisine_preference, dietary_restrictions)
+        cached_result = self._get_cached_result(cache_key)
+        if cached_result:
+            for suggestion in cached_result:
+                yield dict(suggestion)
+            return
+        
+        if self._is_negative_cached(cache_key):
+            yield from self._get_fallback_suggestions(ingredients, cuisine_preference)
+            return
+        
+        suggestions = []
+        try:
+            prompt = self._create_recipe_prompt(ingredients, cuisine_preference, dietary_restrictions, difficulty)
+            
+            logger.info("Streaming AI recipe suggestions for: %s", ingredients)
+            for recipe_data in _iter_recipe_objects(self._stream_gemini_api(prompt, model=self._recipe_model)):
+                suggestion = self._build_suggestion(recipe_data)
+                if suggestion is not None:
+                    suggestions.append(suggestion)
+                    yield self._suggestion_to_dict(suggestion)
+        except Exception as e:
+            logger.error("Failed to stream AI recipe suggestions: %s", e)
+            if not suggestions:
+                yield from self._get_fallback_suggestions(ingredients, cuisine_preference)
+            return
+        
+        if suggestions:
+            self._cache_result(cache_key, suggestions)
+        else:
+            logger.warning("No valid suggestions generated by AI")
+            self._cache_negative(cache_key)
+            yield from self._get_fallback_suggestions(ingredients, cuisine_preference)
+    
+    def get_recipe_suggestions_bulk(self, requests: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Get recipe suggestions for several requests with as few Gemini calls as possible
+        
+        Uncached requests that share cuisine preference, dietary restrictions
+        and difficulty are answered by a single prompt covering all of their
+        ingredient sets; each set's recipes are cached under its own key, so
+        later single requests hit the cache.
+        
+        Args:
+            requests: Keyword-argument dicts for get_recipe_suggestions
+            
+        Returns:
+            List[List[Dict]]: Suggestions for each request, in request order
+        """
+        results = [[] for _ in requests]
+        groups = {}  # (cuisine, restrictions, difficulty) -> [(index, ingredients, cache_key)]
+        
+        for index, request in enumerate(requests):
+            ingredients = _normalize_terms(request.get('ingredients'))
+            if not ingredients:
+                continue
+            cuisine_preference = request.get('cuisine_preference', 'any')
+            dietary_restrictions = _normalize_terms(request.get('dietary_restrictions'))
+            difficulty = request.get('difficulty', 3)
+            
+            cache_key = self._generate_cache_key(ingredients, cuisine_preference, dietary_restrictions)
+            cached_result = self._get_cached_result(cache_key)
+            if cached_result:
+                results[index] = [dict(suggestion) for suggestion in cached_result]
+                continue
+            if self._is_negative_cached(cache_key):
+                results[index] = self._get_fallback_suggestions(ingredients, cuisine_preference)
+                continue
+            
+            group_key = (cuisine_preference, tuple(dietary_restrictions), difficulty)
+            groups.setdefault(group_key, []).append((index, ingredients, cache_key))
+        
+        for (cuisine_preference, dietary_restrictions, difficulty), pending in groups.items():
+            if len(pending) == 1:
+                index, ingredients, _ = pending[0]
+                results[index] = self.get_recipe_suggestions(
+                    ingredients, cuisine_preference, list(dietary_restrictions), difficulty
+                )
+                continue
+            
+            try:
+                prompt = self._create_bulk_recipe_prompt(
+                    [ingredients for _, ingredients, _ in pending],
+                    cuisine_preference, list(dietary_restrictions), difficulty
+                )
+                logger.info("Requesting AI recipe suggestions for %s ingredient sets in one call", len(pending))
+                suggestion_sets = self._parse_bulk_ai_response(self._call_gemini_api(prompt), len(pending))
+            except Exception as e:
+                logger.error("Failed to get bulk AI recipe suggestions: %s", e)
+                for index, ingredients, _ in pending:
+                    results[index] = self._get_fallback_suggestions(ingredients, cuisine_preference)
+                continue
+            
+            for (index, ingredients, cache_key), suggestions in zip(pending, suggestion_sets):
+                if suggestions:
+                    dicts = self._cache_result(cache_key, suggestions)
+                    results[index] = [dict(suggestion) for suggestion in dicts]
+                else:
+                    self._cache_negative(cache_key)
+                    results[index] = self._get_fallback_suggestions(ingredients, cuisine_preference)
+        
+        return results
+    
+    def warm_recipe_cache(self, requests: List[Dict[str, Any]], sets_per_call: int = 5) -> int:
+        """
+        Precompute suggestions for known requests (e.g. popular ingredient sets)
+        
+        Meant for offline/background jobs: requests are packed several to a
+        Gemini call via get_recipe_suggestions_bulk, and the results land in
+        both cache tiers so the interactive path becomes a cache lookup.
+        
+        Args:
+            requests: Keyword-argument dicts for get_recipe_suggestions
+            sets_per_call: Most ingredient sets packed into one prompt
+            
+        Returns:
+            int: Number of requests that now have AI suggestions cached
+        """
+        # Order by shared prompt parameters so each chunk packs into as few calls as possible
+        ordered = sorted(requests, key=lambda request: (
+            request.get('cuisine_preference', 'any'),
+            tuple(_normalize_terms(request.get('dietary_restrictions'))),
+            request.get('difficulty', 3),
+        ))
+        
+        warmed = 0
+        for start in range(0, len(ordered), sets_per_call):
+            for result in self.get_recipe_suggestions_bulk(ordered[start:start + sets_per_call]):
+                if result and result[0].get('source') == 'ai_generated':
+                    warmed += 1
+        logger.info("Warmed AI recipe cache for %s of %s requests", warmed, len(requests))
+        return warmed
+    
+    def _parse_bulk_ai_response(self, response_text: str, count: int) -> List[List[RecipeSuggestion]]:
+        """
+        Split a bulk recipe response into per-set suggestions
+        
+        Args:
+            response_text (str): Raw response from Gemini
+            count (int): Number of ingredient sets in the prompt
+            
+        Returns:
+            List[List[RecipeSuggestion]]: Suggestions for each set, in prompt order
+        """
+        data = _loads(_extract_json(response_text))
+        suggestion_sets = [[] for _ in range(count)]
+        for position, entry in enumerate(data.get('sets', [])):
+            number = entry.get('set', position + 1)
+            if not isinstance(number, int) or not 1 <= number <= count:
+                continue
+            suggestion_sets[number - 1] = [
+                suggestion for suggestion in map(self._build_suggestion, entry.get('recipes', []))
+                if suggestion is not None
+            ]
+        return suggestion_sets
+    
+    def get_recipe_suggestions_coalesced(self, ingredients: List[str],
+                                         cuisine_preference: str = "any",
+                                         dietary_restrictions: List[str] = None,
+                                         difficulty: int = 3) -> List[Dict[str, Any]]:
+        """
+        get_recipe_suggestions for interactive traffic, coalescing concurrent misses
+        
+        Cache hits return immediately. With a batch window configured, misses
+        from concurrent callers are collected briefly and answered by one
+        get_recipe_suggestions_bulk call, so N simultaneous searches spend one
+        request of the Gemini rate budget instead of N.
+        
+        Returns:
+            List[Dict]: Recipe suggestions in dictionary format
+        """
+        request = {
+            'ingredients': ingredients,
+            'cuisine_preference': cuisine_preference,
+            'dietary_restrictions': dietary_restrictions,
+            'difficulty': difficulty,
+        }
+        if self._coalescer is None:
+            return self.get_recipe_suggestions(**request)
+        
+        cache_key = self._generate_cache_key(
+            _normalize_terms(ingredients), cuisine_preference, _normalize_terms(dietary_restrictions)
+        )
+        cached_result = self._get_cached_result(cache_key)
+        if cached_result:
+            return [dict(suggestion) for suggestion in cached_result]
+        return self._coalescer.submit(request).result()
+    
+    def get_recipe_suggestions_many(self, requests: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Get recipe suggestions for several independent requests concurrently
+        
+        Each request's Gemini round-trip overlaps with the others instead of
+        running back to back; the shared rate limiter still applies.
+        
+        Args:
+            requests: Keyword-argument dicts for get_recipe_suggestions
+            
+        Returns:
+            List[List[Dict]]: Suggestions for each request, in request order
+        """
+        if len(requests) <= 1:
+            return [self.get_recipe_suggestions(**request) for request in requests]
+        
+        futures = [self._get_executor().submit(self.get_recipe_suggestions, **request) for request in requests]
+        
+        # One bad request (e.g. malformed input) must not fail the whole batch
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error("Batched AI recipe request failed: %s", e)
+                results.append([])
+        return results
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the fan-out pool once, bounded by max_concurrency"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix='gemini'
+                    )
+        return self._executor
+    
+    def close(self):
+        """Release the fan-out pool; the service can still be used (the pool is recreated on demand)"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
     def _suggestion_to_dict(self, suggestion: RecipeSuggestion) -> Dict[str, Any]:
         """Convert RecipeSuggestion to dictionary format"""
+        (name, ingredients, instructions, cuisine_type, difficulty,
+         cook_time, servings, dietary_tags, confidence_score) = _SUGGESTION_FIELDS(suggestion)
         return {
-            'name': suggestion.name,
-            'ingredients': suggestion.ingredients,
-            'instructions': suggestion.instructions,
-            'cuisine_type': suggestion.cuisine_type,
-            'difficulty_level': suggestion.difficulty,
-            'cook_time_minutes': suggestion.cook_time,
-            'serving_size': suggestion.servings,
-            'dietary_tags': json.dumps(suggestion.dietary_tags),
+            'name': name,
+            'ingredients': ingredients,
+            'instructions': instructions,
+            'cuisine_type': cuisine_type,
+            'difficulty_level': difficulty,
+            'cook_time_minutes': cook_time,
+            'serving_size': servings,
+            'dietary_tags': orjson.dumps(dietary_tags).decode(),
             'source': 'ai_generated',
-            'confidence_score': suggestion.confidence_score
+            'confidence_score': confidence_score
         }
     
     def _get_fallback_suggestions(self, ingredients: List[str], cuisine: str) -> List[Dict[str, Any]]:
@@ -369,55 +1245,37 @@ Important: Respond with valid JSON only. No additional text or formatting."""
         logger.info("Generating fallback recipe suggestions")
         
         fallback_recipes = []
+        available = frozenset(ingredients)
         
         # Common ingredient combinations for fallback recipes
-        if any(protein in ingredients for protein in ['chicken', 'beef', 'lamb', 'fish']):
-            proteins = [ing for ing in ingredients if ing in ['chicken', 'beef', 'lamb', 'fish']]
-            vegetables = [ing for ing in ingredients if ing in ['onions', 'tomatoes', 'carrots', 'potatoes']]
+        # (filters keep the caller's ingredient order; membership is a set lookup)
+        if not available.isdisjoint(_FALLBACK_PROTEINS):
+            proteins = [ing for ing in ingredients if ing in _FALLBACK_PROTEINS]
+            vegetables = [ing for ing in ingredients if ing in _FALLBACK_STIR_FRY_VEGETABLES]
             
             if proteins and vegetables:
+                protein = proteins[0]
                 fallback_recipes.append({
-                    'name': f'{proteins[0].title()} and Vegetable Stir-fry',
-                    'ingredients': proteins + vegetables + ['oil', 'salt', 'pepper'],
-                    'instructions': f'1. Cut {proteins[0]} and vegetables into bite-sized pieces. 2. Heat oil in a large pan. 3. Cook {proteins[0]} until browned. 4. Add vegetables and stir-fry until tender. 5. Season with salt and pepper. 6. Serve hot.',
-                    'cuisine_type': 'global',
-                    'difficulty_level': 2,
-                    'cook_time_minutes': 25,
-                    'serving_size': 4,
-                    'dietary_tags': '["quick", "one-pan"]',
-                    'source': 'fallback',
-                    'confidence_score': 0.6
+                    **_STIR_FRY_FALLBACK,
+                    'name': _STIR_FRY_FALLBACK['name'].format(protein_title=protein.title()),
+                    'ingredients': [*proteins, *vegetables, *_STIR_FRY_EXTRAS],
+                    'instructions': _STIR_FRY_FALLBACK['instructions'].format(protein=protein),
                 })
         
         # Vegetarian fallback
-        vegetables = [ing for ing in ingredients if ing in ['tomatoes', 'onions', 'carrots', 'potatoes', 'spinach', 'mushrooms']]
+        vegetables = [ing for ing in ingredients if ing in _FALLBACK_CURRY_VEGETABLES]
         if len(vegetables) >= 2:
             fallback_recipes.append({
-                'name': 'Mixed Vegetable Curry',
-                'ingredients': vegetables + ['oil', 'cumin', 'turmeric', 'salt'],
-                'instructions': '1. Heat oil in a pot. 2. Add cumin and let it splutter. 3. Add chopped vegetables. 4. Add turmeric and salt. 5. Cover and cook until vegetables are tender. 6. Serve with rice or bread.',
-                'cuisine_type': cuisine if cuisine in ['sudanese', 'indian'] else 'global',
-                'difficulty_level': 2,
-                'cook_time_minutes': 30,
-                'serving_size': 4,
-                'dietary_tags': '["vegetarian", "vegan"]',
-                'source': 'fallback',
-                'confidence_score': 0.6
+                **_CURRY_FALLBACK,
+                'ingredients': [*vegetables, *_CURRY_EXTRAS],
+                'cuisine_type': cuisine if cuisine in _CURRY_CUISINES else 'global',
             })
         
         # Sudanese-inspired fallback
-        if cuisine == 'sudanese' and any(ing in ingredients for ing in ['beans', 'lentils', 'fava beans']):
+        if cuisine == 'sudanese' and not available.isdisjoint(_FALLBACK_LEGUMES):
             fallback_recipes.append({
-                'name': 'Simple Sudanese Bean Stew',
-                'ingredients': ['beans', 'onions', 'tomatoes', 'oil', 'cumin', 'salt'],
-                'instructions': '1. Soak beans overnight if dried. 2. Cook beans until tender. 3. In another pot, fry onions in oil. 4. Add tomatoes and cook until soft. 5. Add cooked beans, cumin, and salt. 6. Simmer for 15 minutes. 7. Serve with bread.',
-                'cuisine_type': 'sudanese',
-                'difficulty_level': 2,
-                'cook_time_minutes': 45,
-                'serving_size': 6,
-                'dietary_tags': '["vegetarian", "high-protein", "traditional"]',
-                'source': 'fallback',
-                'confidence_score': 0.7
+                **_BEAN_STEW_FALLBACK,
+                'ingredients': list(_BEAN_STEW_FALLBACK['ingredients']),
             })
         
         return fallback_recipes[:2]  # Return up to 2 fallback recipes
@@ -433,6 +1291,13 @@ Important: Respond with valid JSON only. No additional text or formatting."""
         Returns:
             List[str]: Suggested substitutions
         """
+        cache_key = (ingredient.lower(), cuisine_type)
+        with self._cache_lock:
+            cached = self._substitutions_cache.get(cache_key)
+            if cached is not None:
+                self._substitutions_cache.move_to_end(cache_key)
+                return list(cached)
+        
         try:
             prompt = f"""Suggest 3-5 common substitutions for "{ingredient}" in {cuisine_type} cooking.
             
@@ -446,22 +1311,86 @@ Respond with JSON only:
 {{"substitutions": ["substitute1", "substitute2", ...]}}"""
 
             response_text = self._call_gemini_api(prompt)
-            result = json.loads(response_text)
-            return result.get('substitutions', [])
+            result = _loads(response_text)
+            substitutions = result.get('substitutions', [])
+            self._cache_substitutions({cache_key: substitutions})
+            return substitutions
             
         except Exception as e:
-            logger.error(f"Failed to get ingredient substitutions: {e}")
+            logger.error("Failed to get ingredient substitutions: %s", e)
             
             # Fallback substitutions
-            common_substitutions = {
-                'chicken': ['turkey', 'tofu', 'tempeh', 'mushrooms'],
-                'beef': ['lamb', 'pork', 'lentils', 'mushrooms'],
-                'butter': ['oil', 'margarine', 'coconut oil', 'ghee'],
-                'milk': ['coconut milk', 'almond milk', 'soy milk', 'water'],
-                'eggs': ['flax eggs', 'chia eggs', 'applesauce', 'banana'],
-                'flour': ['rice flour', 'almond flour', 'coconut flour', 'oat flour']
+            return list(_COMMON_SUBSTITUTIONS.get(ingredient.lower(), ()))
+    
+    def get_ingredient_substitutions_bulk(self, ingredients: List[str],
+                                          cuisine_type: str = "global") -> Dict[str, List[str]]:
+        """
+        Get substitutions for several ingredients with one Gemini call
+        
+        Cached ingredients are answered locally; the rest share one prompt and
+        are cached individually, so later single lookups hit the cache.
+        
+        Args:
+            ingredients: Ingredients to find substitutions for
+            cuisine_type: Cuisine context for substitutions
+            
+        Returns:
+            Dict[str, List[str]]: Suggested substitutions per ingredient (keys as given)
+        """
+        results = {}
+        missing = []
+        with self._cache_lock:
+            for ingredient in dict.fromkeys(ingredients):
+                cache_key = (ingredient.lower(), cuisine_type)
+                cached = self._substitutions_cache.get(cache_key)
+                if cached is None:
+                    missing.append(ingredient)
+                else:
+                    self._substitutions_cache.move_to_end(cache_key)
+                    results[ingredient] = list(cached)
+        
+        if not missing:
+            return results
+        if len(missing) == 1:
+            results[missing[0]] = self.get_ingredient_substitutions(missing[0], cuisine_type)
+            return results
+        
+        try:
+            prompt = _BULK_SUBSTITUTIONS_PROMPT_TEMPLATE.format(
+                cuisine_type=cuisine_type,
+                ingredients=', '.join(f'"{ingredient}"' for ingredient in missing)
+            )
+            response_text = self._call_gemini_api(prompt)
+            # Match answers case-insensitively: the model may normalize the keys
+            answers = {
+                str(name).lower(): subs
+                for name, subs in (_loads(_extract_json(response_text)).get('substitutions') or {}).items()
+                if isinstance(subs, list)
             }
-            return common_substitutions.get(ingredient.lower(), [])
+        except Exception as e:
+            logger.error("Failed to get bulk ingredient substitutions: %s", e)
+            answers = {}
+        
+        fresh = {}
+        for ingredient in missing:
+            substitutions = answers.get(ingredient.lower())
+            if substitutions is None:
+                # Fallback substitutions
+                results[ingredient] = list(_COMMON_SUBSTITUTIONS.get(ingredient.lower(), ()))
+            else:
+                results[ingredient] = substitutions
+                fresh[(ingredient.lower(), cuisine_type)] = substitutions
+        self._cache_substitutions(fresh)
+        return results
+    
+    def _cache_substitutions(self, entries: Dict[tuple, List[str]]):
+        """Cache AI substitutions, evicting the least recently used entries when full"""
+        with self._cache_lock:
+            for cache_key, substitutions in entries.items():
+                self._substitutions_cache[cache_key] = tuple(substitutions)
+                self._substitutions_cache.move_to_end(cache_key)
+            while len(self._substitutions_cache) > self._substitutions_cache_max_size:
+                self._substitutions_cache.popitem(last=False)
 
 # Export the main service class
 __all__ = ['AIRecipeService', 'RecipeSuggestion']
\ No newline at end of file
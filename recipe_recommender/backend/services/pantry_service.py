@@ -4,37 +4,58 @@ Pantry Service
 Manages user's pantry (ingredients storage)
 """
 
-from typing import List, Optional
-from recipe_recommender.backend.models.pantry import PantryItem
-from recipe_recommender.backend.database import get_db_connection
+from typing import Iterator, List, Optional
+from recipe_recommender.backend.models.pantry import PantryItem, PANTRY_COLUMNS
+from recipe_recommender.backend.database import get_db_connection, get_read_connection
+
+# Fixed statement text so every connection's statement cache reuses the compiled query.
+# Columns are selected in PANTRY_COLUMNS order for PantryItem.from_row_positional.
+_PANTRY_SELECT = ', '.join(PANTRY_COLUMNS)
+
+PANTRY_BY_USER_SQL = f'SELECT {_PANTRY_SELECT} FROM pantry_items WHERE user_id = ?'
+
+# RETURNING (SQLite 3.35+) hands back the stored row, saving a follow-up SELECT
+PANTRY_UPSERT_SQL = f'''
+    INSERT INTO pantry_items (user_id, ingredient_name, quantity, unit, expiry_date)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, ingredient_name) DO UPDATE SET
+       quantity = excluded.quantity, unit = excluded.unit, expiry_date = excluded.expiry_date, added_at = CURRENT_TIMESTAMP
+    RETURNING {_PANTRY_SELECT}
+'''
+
+PANTRY_DELETE_SQL = 'DELETE FROM pantry_items WHERE user_id = ? AND ingredient_name = ? RETURNING 1'
+
+PANTRY_EXPIRING_SQL = f'''
+    SELECT {_PANTRY_SELECT} FROM pantry_items
+    WHERE user_id = ? AND expiry_date IS NOT NULL AND expiry_date <= date('now', ?)
+'''
 
 class PantryService:
     def get_pantry(self, user_id: int) -> List[dict]:
-        with get_db_connection() as conn:
-            rows = conn.execute('SELECT * FROM pantry_items WHERE user_id = ?', (user_id,)).fetchall()
-            return [PantryItem.from_row(dict(row)).to_dict() for row in rows]
+        with get_read_connection() as conn:
+            # Stream the cursor; rows map positionally, without an intermediate dict copy
+            return [PantryItem.from_row_positional(row).to_dict()
+                    for row in conn.execute(PANTRY_BY_USER_SQL, (user_id,))]
+
+    def iter_pantry(self, user_id: int) -> Iterator[PantryItem]:
+        """Yield a user's pantry items one at a time (holds a read connection until exhausted)"""
+        with get_read_connection() as conn:
+            for row in conn.execute(PANTRY_BY_USER_SQL, (user_id,)):
+                yield PantryItem.from_row_positional(row)
 
     def add_or_update_item(self, user_id: int, ingredient_name: str, quantity: Optional[str]=None, unit: Optional[str]=None, expiry_date: Optional[str]=None) -> dict:
         with get_db_connection() as conn:
-            # Insert or update
-            conn.execute('''
-                INSERT INTO pantry_items (user_id, ingredient_name, quantity, unit, expiry_date)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(user_id, ingredient_name) DO UPDATE SET
-                   quantity = excluded.quantity, unit = excluded.unit, expiry_date = excluded.expiry_date, added_at = CURRENT_TIMESTAMP
-                ''', (user_id, ingredient_name, quantity, unit, expiry_date))
-            row = conn.execute('SELECT * FROM pantry_items WHERE user_id = ? AND ingredient_name = ?', (user_id, ingredient_name)).fetchone()
-            return PantryItem.from_row(dict(row)).to_dict() if row else None
+            # Insert or update, reading the stored row back in the same statement;
+            # fetchall drains the cursor so the statement is reset and releases its lock
+            rows = conn.execute(PANTRY_UPSERT_SQL, (user_id, ingredient_name, quantity, unit, expiry_date)).fetchall()
+            return PantryItem.from_row_positional(rows[0]).to_dict() if rows else None
 
     def remove_item(self, user_id: int, ingredient_name: str) -> bool:
         with get_db_connection() as conn:
-            conn.execute('DELETE FROM pantry_items WHERE user_id = ? AND ingredient_name = ?', (user_id, ingredient_name))
-            return True
+            # True only if a row was actually deleted
+            return bool(conn.execute(PANTRY_DELETE_SQL, (user_id, ingredient_name)).fetchall())
 
     def get_expiring_items(self, user_id: int, days: int = 3) -> List[dict]:
-        with get_db_connection() as conn:
-            rows = conn.execute('''
-                SELECT * FROM pantry_items 
-                WHERE user_id = ? AND expiry_date IS NOT NULL AND expiry_date <= date('now', ?)
-            ''', (user_id, f'+{days} days')).fetchall()
-            return [PantryItem.from_row(dict(row)).to_dict() for row in rows]
\ No newline at end of file
+        with get_read_connection() as conn:
+            return [PantryItem.from_row_positional(row).to_dict()
+                    for row in conn.execute(PANTRY_EXPIRING_SQL, (user_id, f'+{days} days'))]
\ No newline at end of file
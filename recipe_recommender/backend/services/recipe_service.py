@@ -8,97 +8,219 @@ Business logic for:
 """
 
 from typing import List, Optional
-from recipe_recommender.backend.models.recipe import Recipe
 from recipe_recommender.backend.database import (
 
-    get_db_connection, search_recipes_by_ingredients
+    get_db_connection, get_read_connection, search_recipe_models
 )
-import json
+import orjson
+import atexit
+import heapq
 import logging
+import re
+import sqlite3
+import time
 from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+from threading import Lock, Thread
 
 logger = logging.getLogger(__name__)
 
+# Fixed statement text so every connection's statement cache reuses the compiled query
+LOG_SEARCH_SQL = 'INSERT INTO search_logs (ingredients, results_count, cuisine_preference, session_id) VALUES (?, ?, ?, ?)'
+
+# Search log rows are buffered in memory and written in batches, off the request path
+SEARCH_LOG_FLUSH_SECONDS = 0.25
+SEARCH_LOG_FLUSH_EVENTS = 500
+
+RECENT_SEARCH_INGREDIENTS_SQL = "SELECT ingredients FROM search_logs WHERE search_timestamp > datetime('now', '-30 days')"
+
+# Ingredient counts over the last 30 days, exploded and grouped inside SQLite (JSON1);
+# rows that are not JSON arrays are skipped, as the Python path does
+RECENT_INGREDIENT_COUNTS_SQL = '''
+    SELECT lower(trim(je.value)) AS ingredient, COUNT(*) AS uses
+    FROM search_logs, json_each(search_logs.ingredients) AS je
+    WHERE search_timestamp > datetime('now', '-30 days')
+      AND json_valid(search_logs.ingredients)
+      AND json_type(search_logs.ingredients) = 'array'
+      AND je.type = 'text'
+    GROUP BY ingredient
+'''
+
+# Canonical token rules: punctuation (incl. hyphens) becomes a space, runs of spaces collapse
+_TOKEN_PUNCTUATION = re.compile(r'[^\w\s]+|_')
+_TOKEN_WHITESPACE = re.compile(r'\s+')
+_TOKEN_ARTICLES = frozenset({'a', 'an', 'the'})
+
+@lru_cache(maxsize=4096)
+def _norm_token(text: str) -> str:
+    """
+    Canonical form of an ingredient or recipe name for matching and counting
+    
+    "Bell-Pepper", "bell  pepper" and "the bell pepper" all become
+    "bell pepper": lowercase, punctuation to spaces, whitespace collapsed,
+    leading article dropped.
+    """
+    words = _TOKEN_WHITESPACE.split(_TOKEN_PUNCTUATION.sub(' ', text.lower()).strip())
+    if len(words) > 1 and words[0] in _TOKEN_ARTICLES:
+        words = words[1:]
+    return ' '.join(words)
+
+def flush_search_logs():
+    """
+    Write buffered search log rows in a single transaction
+    
+    Returns:
+        int: Number of rows written
+    """
+    global _search_log_buffer
+    
+    with _search_log_lock:
+        if not _search_log_buffer:
+            return 0
+        pending = _search_log_buffer
+        _search_log_buffer = []
+    
+    try:
+        with get_db_connection() as conn:
+            conn.executemany(LOG_SEARCH_SQL, pending)
+    except Exception:
+        # The transaction rolled back: put the rows back, ahead of newer ones
+        with _search_log_lock:
+            _search_log_buffer = pending + _search_log_buffer
+        raise
+    
+    return len(pending)
+
+def _start_search_log_flusher():
+    """Start the background flusher thread once (caller holds _search_log_lock)"""
+    global _search_log_flusher
+    
+    if _search_log_flusher is not None:
+        return
+    
+    def flusher():
+        while True:
+            time.sleep(SEARCH_LOG_FLUSH_SECONDS)
+            try:
+                flush_search_logs()
+            except Exception as e:
+                logger.error(f"Search log flush failed: {e}")
+    
+    _search_log_flusher = Thread(target=flusher, name='search-log-flusher', daemon=True)
+    _search_log_flusher.start()
+
+_search_log_buffer = []
+_search_log_lock = Lock()
+_search_log_flusher = None
+atexit.register(flush_search_logs)
+
+# Ranking key (C-level getter): ingredient score, then popularity; every ranked dict carries both
+_RANK_KEY = itemgetter('score', 'popularity_score')
+
 class RecipeService:
     def find_matching_recipes(self, ingredients: List[str], cuisine_type: Optional[str]=None, max_cook_time: Optional[int]=None, difficulty: Optional[int]=None, limit: int=10) -> List[dict]:
         """
         Find recipes in DB by ingredient matching and filters.
         """
-        matches = search_recipes_by_ingredients(ingredients, limit=limit)
-        results = []
-        for row in matches:
-            # Filter by cuisine_type, cook_time, difficulty
-            if cuisine_type and row.get("cuisine_type") != cuisine_type:
-                continue
-            if max_cook_time and row.get("cook_time_minutes", 99) > max_cook_time:
-                continue
-            if difficulty and row.get("difficulty_level") != difficulty:
-                continue
-            results.append(Recipe.from_row(row).to_dict())
+        # Filters run in SQL ahead of the LIMIT, so rejected rows are never hydrated
+        matches = search_recipe_models(ingredients, limit=limit, cuisine_type=cuisine_type,
+                                       max_cook_time=max_cook_time, difficulty=difficulty)
+        results = [recipe.to_dict() for recipe in matches]
         logger.info(f"Found {len(results)} DB recipe matches for {ingredients}")
         return results
 
-    def combine_and_rank_recipes(self, ai_recipes, db_recipes, ingredients: List[str]) -> List[dict]:
+    def combine_and_rank_recipes(self, ai_recipes, db_recipes, ingredients: List[str], limit: Optional[int]=None) -> List[dict]:
         """
         Combine, dedupe, and rank AI and DB recipes by ingredient overlap.
         AI recipes get a boost due to novelty/confidence.
+        With a limit, only the top `limit` recipes are selected and returned.
+        """
+        return self.rank_recipes(self.score_recipes(ai_recipes, db_recipes, ingredients), limit)
+
+    def score_recipes(self, ai_recipes, db_recipes, ingredients: List[str]) -> List[dict]:
         """
+        Dedupe AI and DB recipes and set each one's ranking score (unsorted).
+        """
+        # Normalize the query once into an immutable set shared by every _ingredient_score call
+        input_set = frozenset(_norm_token(i) for i in ingredients)
         all_recipes = []
         seen_names = set()
-        # DB recipes first
-        for r in db_recipes:
-            key = (r['name'].strip().lower(), r.get('cuisine_type',''))
-            if key in seen_names:
-                continue
-            r['score'] = self._ingredient_score(r['ingredients'], ingredients)
-            seen_names.add(key)
-            all_recipes.append(r)
-        # AI recipes, adjust scoring
-        for r in ai_recipes:
-            key = (r['name'].strip().lower(), r.get('cuisine_type',''))
-            if key in seen_names:
-                continue
-            r['score'] = self._ingredient_score(r['ingredients'], ingredients) + 1.5  # boost
-            seen_names.add(key)
-            all_recipes.append(r)
-        # Sort by score, then popularity_score if present
-        all_recipes.sort(key=lambda r: (-r['score'], -r.get('popularity_score',0)))
+        # DB recipes first, then AI recipes with a scoring boost; one loop shape for both
+        for recipes, boost in ((db_recipes, 0), (ai_recipes, 1.5)):
+            for r in recipes:
+                key = (_norm_token(r['name']), r.get('cuisine_type',''))
+                if key in seen_names:
+                    continue
+                seen_names.add(key)
+                r['score'] = self._ingredient_score(r['ingredients'], input_set) + boost
+                r.setdefault('popularity_score', 0)
+                all_recipes.append(r)
         return all_recipes
 
-    def _ingredient_score(self, recipe_ingredients, input_ingredients):
-        """Ingredient overlap score for ranking (simple count overlap)"""
+    def rank_recipes(self, recipes: List[dict], limit: Optional[int]=None) -> List[dict]:
+        """
+        Order scored recipes by score, then popularity_score (descending; ties keep input order).
+        With a limit, only the top `limit` recipes are selected and returned.
+        """
+        if limit is not None:
+            # Top-k selection is O(N log k); same order and tie-breaking as the stable sort
+            return heapq.nlargest(limit, recipes, key=_RANK_KEY)
+        return sorted(recipes, key=_RANK_KEY, reverse=True)
+
+    def _ingredient_score(self, recipe_ingredients, input_set):
+        """Ingredient overlap score for ranking (count of recipe ingredients in the normalized query set)"""
+        if not recipe_ingredients:
+            return 0
         if isinstance(recipe_ingredients, str):
             try:
-                recipe_ingredients = json.loads(recipe_ingredients)
+                recipe_ingredients = orjson.loads(recipe_ingredients)
             except Exception:
-                recipe_ingredients = [i.strip() for i in recipe_ingredients.split(',') if i.strip()]
-        matches = set(map(str.lower, recipe_ingredients)) & set(map(str.lower, input_ingredients))
-        return len(matches)
+                recipe_ingredients = recipe_ingredients.split(',')
+        # Canonicalize and probe the query set in one traversal
+        return len({term for term in map(_norm_token, filter(None, recipe_ingredients)) if term in input_set})
 
     def log_search(self, ingredients: List[str], result_count: int, cuisine_preference: Optional[str]=None, session_id: Optional[str]=None):
         """
         Log a recipe search for analytics.
+        
+        The row is buffered and written by flush_search_logs(), either from the
+        background flusher or once SEARCH_LOG_FLUSH_EVENTS rows pile up.
         """
-        with get_db_connection() as conn:
-            conn.execute(
-                'INSERT INTO search_logs (ingredients, results_count, cuisine_preference, session_id) VALUES (?, ?, ?, ?)',
-                (json.dumps(ingredients), result_count, cuisine_preference, session_id)
-            )
+        row = (orjson.dumps(ingredients).decode(), result_count, cuisine_preference, session_id)
+        with _search_log_lock:
+            _search_log_buffer.append(row)
+            flush_now = len(_search_log_buffer) >= SEARCH_LOG_FLUSH_EVENTS
+            _start_search_log_flusher()
+        
+        if flush_now:
+            flush_search_logs()
 
     def get_popular_ingredients(self, limit=20) -> List[str]:
         """
         Analyze logs to return popular search ingredients this month.
         """
         counter = Counter()
-        with get_db_connection() as conn:
-            logs = conn.execute(
-                "SELECT ingredients FROM search_logs WHERE search_timestamp > datetime('now', '-30 days')"
-            ).fetchall()
-            for row in logs:
+        with get_read_connection() as conn:
+            try:
+                # SQLite does the per-row decoding and counting; only distinct
+                # ingredients come back, folded into canonical buckets here
+                for ingredient, uses in conn.execute(RECENT_INGREDIENT_COUNTS_SQL):
+                    token = _norm_token(ingredient)
+                    if token:
+                        counter[token] += uses
+                return [item for item,_ in counter.most_common(limit)]
+            except sqlite3.OperationalError as e:
+                # SQLite built without JSON1: decode the logs in Python
+                logger.warning("SQL ingredient aggregation unavailable (%s); counting in Python", e)
+                counter.clear()
+            # Stream the cursor so only one log row's JSON is held at a time
+            for row in conn.execute(RECENT_SEARCH_INGREDIENTS_SQL):
                 try:
-                    ings = json.loads(row['ingredients'])
+                    ings = orjson.loads(row['ingredients'])
                     if isinstance(ings, list):
-                        counter.update(ing.strip().lower() for ing in ings)
+                        # Non-string entries are skipped, as the SQL path does
+                        counter.update(filter(None, (_norm_token(i) for i in ings if isinstance(i, str))))
                 except Exception:
                     continue
         return [item for item,_ in counter.most_common(limit)]
\ No newline at end of file
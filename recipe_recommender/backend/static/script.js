@@ -23,6 +23,7 @@ class RecipeRecommender {
         // API endpoints
         this.endpoints = {
             search: '/api/recipes/search',
+            recipe: '/api/recipes',
             pantry: '/api/pantry',
             ingredients: '/api/ingredients/suggestions'
         };
@@ -743,6 +744,19 @@ class RecipeRecommender {
         const recipe = this.currentRecipes[index];
         if (!recipe) return;
         
+        // Search results omit instructions; load the full recipe on first open
+        if (!recipe.instructions && recipe.id && !recipe.detailsLoaded) {
+            recipe.detailsLoaded = true;
+            fetch(`${this.endpoints.recipe}/${recipe.id}`)
+                .then(response => response.ok ? response.json() : null)
+                .then(fullRecipe => {
+                    if (fullRecipe) Object.assign(recipe, fullRecipe);
+                })
+                .catch(error => console.error('Error loading recipe details:', error))
+                .finally(() => this.showRecipeDetails(index));
+            return;
+        }
+        
         const modal = document.getElementById('recipeModal');
         const content = document.getElementById('recipeModalContent');
         
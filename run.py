@@ -6,8 +6,9 @@ Recipe Recommender Application Entry Point
 Production-ready Flask application runner with proper configuration.
 
 Usage:
-    python run.py                    # Development mode
-    gunicorn -c gunicorn.conf.py app:app  # Production mode
+    python run.py                    # Flask dev server when FLASK_ENV=development or DEBUG=true,
+                                     # otherwise hands off to gunicorn (gunicorn.conf.py)
+    gunicorn -c gunicorn.conf.py recipe_recommender.backend.app:app  # Production mode
 """
 
 import os
@@ -19,32 +20,56 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 
 # try:
-from recipe_recommender.backend.app import create_app
+# The application itself is imported in main(), only when the dev server runs
 from recipe_recommender.backend.config import Config
 # except ImportError as e:
 #     print(f"❌ Error importing application: {e}")
 #     print("💡 Make sure you've run 'python setup.py' first")
 #     sys.exit(1)
 
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def run_gunicorn(host, port):
+    """
+    Replace this process with gunicorn using the production config
+    
+    exec'ing a fresh interpreter means the application (and ssl/sqlite3)
+    is first imported inside the gevent workers, after they monkey-patch.
+    """
+    os.execv(sys.executable, [
+        sys.executable, '-m', 'gunicorn',
+        '--config', os.path.join(PROJECT_ROOT, 'gunicorn.conf.py'),
+        '--chdir', PROJECT_ROOT,
+        '--bind', f'{host}:{port}',
+        'recipe_recommender.backend.app:app'
+    ])
+
 def main():
     """Main application runner"""
     try:
-        # Create Flask application
-        app = create_app()
-        
         # Get configuration
         port = int(os.environ.get('PORT', 3456))  # Default to 3456 for container/coolify
         host = os.environ.get('HOST', '0.0.0.0') # Listen on all interfaces by default
         debug = os.environ.get('DEBUG', 'False').lower() == 'true'
+        dev_server = debug or Config.FLASK_ENV == 'development'
         
         print("🍽️  Recipe Recommender Starting...")
         print("=" * 40)
         print(f"🌐 Server: http://{host}:{port}")
         print(f"🔧 Environment: {Config.FLASK_ENV}")
         print(f"🐛 Debug mode: {debug}")
+        print(f"🚀 Runner: {'Flask development server' if dev_server else 'gunicorn (gevent workers)'}")
         print("=" * 40)
         
-        # Run the application
+        if not dev_server:
+            sys.stdout.flush()
+            run_gunicorn(host, port)
+        
+        # Create Flask application
+        from recipe_recommender.backend.app import create_app
+        app = create_app()
+        
+        # Run the development server
         app.run(
             host=host,
             port=port,
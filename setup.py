@@ -20,16 +20,16 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 
 # Add both the project root and the parent directory to sys.path for robust imports
-PROJECT_ROOT = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 PARENT_DIR = os.path.dirname(PROJECT_ROOT)
-sys.path.insert(0, PARENT_DIR)        # add parent directory
-sys.path.insert(0, PROJECT_ROOT)      # add project root itself
+for path in (PARENT_DIR, PROJECT_ROOT):   # project root ends up first
+    if path not in sys.path:
+        sys.path.insert(0, path)
 #print("Current working directory:", os.getcwd())
 # print("sys.path:", sys.path)
 # print("Current working directory:", os.getcwd())
 # try:
 from recipe_recommender.backend.config import Config
-from recipe_recommender.backend.database import init_db, cleanup_old_data
 # except ImportError as e:
 #     print(f"Error importing modules: {e}")
 #     print("Tip: Be sure you're running from the project root (should contain setup.py and the recipe_recommender/ folder). Printing directory listing:")
@@ -45,6 +45,9 @@ logger = logging.getLogger(__name__)
 def setup_database():
     """Initialize database with schema and seed data"""
     try:
+        # Imported here (like verify_setup) so loading setup.py does not pull in the database layer
+        from recipe_recommender.backend.database import init_db, cleanup_old_data
+        
         logger.info("🚀 Starting database setup...")
         
         # Ensure data directory exists
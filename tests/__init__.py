@@ -0,0 +1,4 @@
+import os
+
+# config.py validates the environment on import; tests never call Gemini
+os.environ.setdefault('GEMINI_API_KEY', 'test-gemini-api-key-for-testing-only')
@@ -0,0 +1,264 @@
+"""
+Tests for the AI recipe service
+"""
+
+import threading
+import unittest
+from unittest import mock
+
+import orjson
+
+from recipe_recommender.backend.services import ai_service
+from recipe_recommender.backend.services.ai_service import (
+    AIRecipeService, RateLimiter, RecipeSuggestion, RequestCoalescer, TokenBucketRateLimiter
+)
+
+
+def make_service(**kwargs):
+    """AI service with a dummy key; tests patch _call_gemini_api, so nothing hits the network"""
+    return AIRecipeService(api_key='test-key', **kwargs)
+
+
+class FakeClock:
+    """Stands in for the time module inside ai_service: sleep advances monotonic()"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeL2Cache:
+    """Dict-backed stand-in for the shared Flask-Caching backend"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+
+RECIPE_RESPONSE = (
+    '{"recipes": [{"name": "Ful Medames", "ingredients": ["fava beans", "garlic"], '
+    '"instructions": "Simmer the beans."}]}'
+)
+
+
+class BulkSubstitutionsTest(unittest.TestCase):
+    def setUp(self):
+        self.service = make_service()
+
+    def test_parses_bulk_response_per_ingredient(self):
+        response = 'Sure!\n{"substitutions": {"BUTTER": ["margarine", "ghee"], "milk": ["oat milk"]}}'
+        with mock.patch.object(self.service, '_call_gemini_api', return_value=response) as call:
+            result = self.service.get_ingredient_substitutions_bulk(['Butter', 'milk'])
+
+        self.assertEqual(call.call_count, 1)
+        self.assertEqual(result, {'Butter': ['margarine', 'ghee'], 'milk': ['oat milk']})
+
+    def test_missing_answers_fall_back_and_are_not_cached(self):
+        response = '{"substitutions": {"milk": ["oat milk"], "eggs": "not a list"}}'
+        with mock.patch.object(self.service, '_call_gemini_api', return_value=response):
+            result = self.service.get_ingredient_substitutions_bulk(['milk', 'eggs'])
+
+        self.assertEqual(result['milk'], ['oat milk'])
+        self.assertIsInstance(result['eggs'], list)
+        self.assertIn(('milk', 'global'), self.service._substitutions_cache)
+        self.assertNotIn(('eggs', 'global'), self.service._substitutions_cache)
+
+    def test_fills_per_ingredient_cache(self):
+        response = '{"substitutions": {"butter": ["ghee"], "milk": ["oat milk"]}}'
+        with mock.patch.object(self.service, '_call_gemini_api', return_value=response):
+            self.service.get_ingredient_substitutions_bulk(['butter', 'milk'], 'sudanese')
+
+        with mock.patch.object(self.service, '_call_gemini_api') as call:
+            self.assertEqual(self.service.get_ingredient_substitutions('Butter', 'sudanese'), ['ghee'])
+            self.assertEqual(
+                self.service.get_ingredient_substitutions_bulk(['milk', 'butter'], 'sudanese'),
+                {'milk': ['oat milk'], 'butter': ['ghee']}
+            )
+        call.assert_not_called()
+
+    def test_only_uncached_ingredients_are_requested(self):
+        self.service._cache_substitutions({('butter', 'global'): ['ghee']})
+        response = '{"substitutions": {"milk": ["oat milk"], "eggs": ["flax egg"]}}'
+        with mock.patch.object(self.service, '_call_gemini_api', return_value=response) as call:
+            result = self.service.get_ingredient_substitutions_bulk(['butter', 'milk', 'eggs'])
+
+        prompt = call.call_args[0][0]
+        self.assertNotIn('"butter"', prompt)
+        self.assertIn('"milk"', prompt)
+        self.assertIn('"eggs"', prompt)
+        self.assertEqual(result, {'butter': ['ghee'], 'milk': ['oat milk'], 'eggs': ['flax egg']})
+
+    def test_api_failure_falls_back_without_caching(self):
+        with mock.patch.object(self.service, '_call_gemini_api', side_effect=RuntimeError('boom')):
+            result = self.service.get_ingredient_substitutions_bulk(['butter', 'milk'])
+
+        self.assertEqual(set(result), {'butter', 'milk'})
+        self.assertEqual(len(self.service._substitutions_cache), 0)
+
+
+
+class RequestCoalescerTest(unittest.TestCase):
+    def test_dispatches_when_window_elapses(self):
+        calls = []
+        dispatched = threading.Event()
+
+        def handler(requests):
+            calls.append(list(requests))
+            dispatched.set()
+            return [request * 2 for request in requests]
+
+        coalescer = RequestCoalescer(handler, window=0.05, max_batch=10)
+        first, second = coalescer.submit(1), coalescer.submit(2)
+        self.assertFalse(first.done())
+
+        self.assertTrue(dispatched.wait(5))
+        self.assertEqual((first.result(5), second.result(5)), (2, 4))
+        self.assertEqual(calls, [[1, 2]])
+
+    def test_dispatches_at_max_batch_without_waiting_for_window(self):
+        calls = []
+
+        def handler(requests):
+            calls.append((list(requests), threading.current_thread()))
+            return list(requests)
+
+        coalescer = RequestCoalescer(handler, window=60, max_batch=2)
+        first, second = coalescer.submit('a'), coalescer.submit('b')
+
+        # Full batch runs on the submitting thread and cancels the window timer
+        self.assertTrue(first.done() and second.done())
+        self.assertEqual(calls, [(['a', 'b'], threading.current_thread())])
+        self.assertIsNone(coalescer._timer)
+        self.assertEqual(coalescer._pending, [])
+
+    def test_handler_exception_reaches_every_waiter(self):
+        error = RuntimeError('batch failed')
+        coalescer = RequestCoalescer(mock.Mock(side_effect=error), window=60, max_batch=3)
+        futures = [coalescer.submit(n) for n in range(3)]
+
+        for future in futures:
+            self.assertIs(future.exception(0), error)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(ai_service, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sliding_window_blocks_until_oldest_call_expires(self):
+        limiter = RateLimiter(max_calls_per_minute=2)
+        limiter.wait_if_needed()
+        self.clock.now += 10
+        limiter.wait_if_needed()
+        self.assertEqual(self.clock.sleeps, [])
+
+        limiter.wait_if_needed()
+        self.assertEqual(self.clock.sleeps, [50.0])
+        self.assertEqual(len(limiter.calls), 2)
+
+    def test_sliding_window_admits_again_after_window(self):
+        limiter = RateLimiter(max_calls_per_minute=1)
+        limiter.wait_if_needed()
+        self.clock.now += RateLimiter.WINDOW_SECONDS
+        limiter.wait_if_needed()
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_token_bucket_allows_burst_then_paces(self):
+        limiter = TokenBucketRateLimiter(max_calls_per_minute=60, capacity=3)
+        for _ in range(3):
+            limiter.wait_if_needed()
+        self.assertEqual(self.clock.sleeps, [])
+
+        limiter.wait_if_needed()
+        self.assertAlmostEqual(self.clock.sleeps[-1], 1.0)
+
+    def test_token_bucket_refills_over_time_up_to_capacity(self):
+        limiter = TokenBucketRateLimiter(max_calls_per_minute=60, capacity=2)
+        limiter.wait_if_needed()
+        limiter.wait_if_needed()
+        self.clock.now += 600
+        limiter.wait_if_needed()
+        limiter.wait_if_needed()
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertAlmostEqual(limiter.tokens, 0.0)
+
+
+class AIResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.l2 = FakeL2Cache()
+        self.service = make_service(l2_cache=self.l2, cache_size=2)
+
+    def test_l1_evicts_least_recently_used(self):
+        suggestion = [RecipeSuggestion(name='Soup', ingredients=['water'], instructions='Boil.')]
+        for key in (b'a', b'b'):
+            self.service._cache_result(key, suggestion)
+        self.service._get_cached_result(b'a')
+        self.service._cache_result(b'c', suggestion)
+
+        self.assertEqual(list(self.service._cache), [b'a', b'c'])
+
+    def test_result_is_written_through_and_promoted_from_l2(self):
+        with mock.patch.object(self.service, '_call_gemini_api', return_value=RECIPE_RESPONSE) as call:
+            first = self.service.get_recipe_suggestions(['fava beans', 'garlic'])
+        self.assertEqual(call.call_count, 1)
+        self.assertEqual(first[0]['name'], 'Ful Medames')
+        (l2_key, raw), = self.l2.data.items()
+        self.assertTrue(l2_key.startswith('ai:'))
+        self.assertEqual(orjson.loads(raw)[0]['name'], 'Ful Medames')
+
+        # A fresh process (empty L1) sharing the L2 answers without calling Gemini
+        other = make_service(l2_cache=self.l2)
+        with mock.patch.object(other, '_call_gemini_api') as call:
+            self.assertEqual(other.get_recipe_suggestions(['garlic', 'fava beans']), first)
+            self.assertEqual(other.get_recipe_suggestions(['garlic', 'fava beans']), first)
+        call.assert_not_called()
+        self.assertEqual(len(other._cache), 1)
+        stats = other.get_cache_stats()
+        self.assertEqual((stats['l1_hits'], stats['l2_hits'], stats['misses']), (1, 1, 0))
+
+    def test_unreadable_l2_entry_is_a_miss_and_deleted(self):
+        cache_key = self.service._generate_cache_key(['fava beans'], 'any', [])
+        l2_key = f"ai:{cache_key.hex()}"
+        for raw in (b'not json', orjson.dumps([{'name': 'Old', 'removed_field': 1}])):
+            self.l2.data[l2_key] = raw
+            self.assertIsNone(self.service._get_cached_result(cache_key))
+            self.assertNotIn(l2_key, self.l2.data)
+
+        with mock.patch.object(self.service, '_call_gemini_api', return_value=RECIPE_RESPONSE) as call:
+            self.assertEqual(self.service.get_recipe_suggestions(['fava beans'])[0]['name'], 'Ful Medames')
+        self.assertEqual(call.call_count, 1)
+        self.assertEqual(self.service.get_cache_stats()['misses'], 3)
+
+    def test_empty_answer_is_negative_cached_until_ttl(self):
+        clock = FakeClock()
+        with mock.patch.object(ai_service, 'time', clock), \
+                mock.patch.object(self.service, '_call_gemini_api', return_value='{"recipes": []}') as call:
+            self.service.get_recipe_suggestions(['stones'])
+            self.service.get_recipe_suggestions(['stones'])
+            self.assertEqual(call.call_count, 1)
+
+            clock.now += self.service._negative_cache_ttl
+            self.service.get_recipe_suggestions(['stones'])
+            self.assertEqual(call.call_count, 2)
+        self.assertEqual(self.l2.data, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
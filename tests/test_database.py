@@ -0,0 +1,226 @@
+"""
+Tests for the SQLite database layer
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import orjson
+
+from recipe_recommender.backend import database
+
+
+def recipe_row(name, ingredients, cuisine_type='global', difficulty_level=3, cook_time_minutes=30,
+               dietary_tags=()):
+    """Row in RECIPE_INSERT_SQL column order"""
+    return (
+        name, orjson.dumps(list(ingredients)).decode(), 'Cook it.', cuisine_type, difficulty_level,
+        cook_time_minutes, 4, None, orjson.dumps(list(dietary_tags)).decode(), 'test'
+    )
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Runs each test against a fresh, initialized database file"""
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        manager = database.DatabaseManager(os.path.join(tmpdir.name, 'recipes.db'), pool_size=2)
+        self.addCleanup(manager.close_all)
+        patcher = mock.patch.object(database, 'db_manager', manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        database._fetch_recipe_model.cache_clear()
+        database.init_db()
+
+    def add_recipes(self, *rows):
+        """Insert recipe rows and return their ids by name"""
+        database.bulk_insert_recipes(list(rows))
+        with database.get_read_connection() as conn:
+            return {
+                row['name']: row['id']
+                for row in conn.execute('SELECT id, name FROM recipes WHERE source = ?', ('test',))
+            }
+
+
+class PopularityBufferTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        # Flush explicitly; the background flusher would race the assertions
+        for patcher in (
+            mock.patch.object(database, '_start_popularity_flusher'),
+            mock.patch.object(database, '_popularity_buffer', database.Counter()),
+            mock.patch.object(database, '_popularity_events', 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.ids = self.add_recipes(recipe_row('Toast', ['bread']), recipe_row('Stew', ['lentils']))
+
+    def scores(self):
+        with database.get_read_connection() as conn:
+            return {
+                row['name']: row['popularity_score']
+                for row in conn.execute('SELECT name, popularity_score FROM recipes WHERE source = ?', ('test',))
+            }
+
+    def test_increments_are_buffered_until_flush(self):
+        for _ in range(3):
+            database.update_recipe_popularity(self.ids['Toast'], 'view')
+        database.update_recipe_popularity(self.ids['Stew'], 'cook')
+        self.assertEqual(self.scores(), {'Toast': 0.0, 'Stew': 0.0})
+
+        self.assertEqual(database.flush_recipe_popularity(), 2)
+        scores = self.scores()
+        self.assertAlmostEqual(scores['Toast'], 0.3)
+        self.assertAlmostEqual(scores['Stew'], 1.0)
+        self.assertEqual(database._popularity_events, 0)
+
+    def test_failed_flush_keeps_increments_and_event_count(self):
+        for _ in range(3):
+            database.update_recipe_popularity(self.ids['Toast'], 'view')
+        database.update_recipe_popularity(self.ids['Stew'], 'cook')
+
+        with mock.patch.object(database, 'get_db_connection', side_effect=sqlite3.OperationalError('locked')):
+            with self.assertRaises(sqlite3.OperationalError):
+                database.flush_recipe_popularity()
+        self.assertEqual(database._popularity_events, 4)
+
+        database.update_recipe_popularity(self.ids['Toast'], 'rate')
+        self.assertEqual(database._popularity_events, 5)
+        self.assertEqual(database.flush_recipe_popularity(), 2)
+        scores = self.scores()
+        self.assertAlmostEqual(scores['Toast'], 0.8)
+        self.assertAlmostEqual(scores['Stew'], 1.0)
+
+    def test_size_trigger_flushes_inline(self):
+        with mock.patch.object(database, 'POPULARITY_FLUSH_EVENTS', 2):
+            database.update_recipe_popularity(self.ids['Stew'], 'cook')
+            self.assertEqual(self.scores()['Stew'], 0.0)
+            database.update_recipe_popularity(self.ids['Stew'], 'cook')
+        self.assertAlmostEqual(self.scores()['Stew'], 2.0)
+
+
+class RecipeModelCacheTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.recipe_id = self.add_recipes(recipe_row('Toast', ['bread', 'butter']))['Toast']
+
+    def test_unchanged_row_reuses_cached_model(self):
+        model = database.get_recipe_model(self.recipe_id)
+        self.assertEqual(model.name, 'Toast')
+        self.assertIs(database.get_recipe_model(self.recipe_id), model)
+
+    def test_row_change_from_any_writer_is_seen(self):
+        model = database.get_recipe_model(self.recipe_id)
+        with database.get_db_connection() as conn:
+            conn.execute(database.POPULARITY_UPDATE_SQL, (2.5, self.recipe_id))
+
+        fresh = database.get_recipe_model(self.recipe_id)
+        self.assertIsNot(fresh, model)
+        self.assertEqual(fresh.popularity_score, 2.5)
+
+    def test_missing_recipe_is_not_cached(self):
+        self.assertIsNone(database.get_recipe_model(9999))
+        self.assertEqual(database._fetch_recipe_model.cache_info().currsize, 0)
+
+    def test_response_dicts_do_not_share_cached_lists(self):
+        data = database.get_recipe_model(self.recipe_id).to_dict()
+        data['ingredients'].append('jam')
+        data['dietary_tags'].append('sweet')
+
+        model = database.get_recipe_model(self.recipe_id)
+        self.assertEqual(model.ingredients, ['bread', 'butter'])
+        self.assertEqual(model.dietary_tags, [])
+
+
+class RecipeListColumnsTest(DatabaseTestCase):
+    def test_lists_keep_their_stored_order(self):
+        recipe_id = self.add_recipes(
+            recipe_row('Porridge', ['water', 'oats', 'apple', 'oats'], dietary_tags=['vegan', 'breakfast'])
+        )['Porridge']
+
+        model = database.get_recipe_model(recipe_id)
+        self.assertEqual(model.ingredients, ['water', 'oats', 'apple', 'oats'])
+        self.assertEqual(model.dietary_tags, ['vegan', 'breakfast'])
+        found, = database.search_recipes_by_ingredients(['oats'])
+        self.assertEqual(found['ingredients'], ['water', 'oats', 'apple', 'oats'])
+        self.assertEqual(found['dietary_tags'], ['vegan', 'breakfast'])
+
+    def test_updated_lists_are_mirrored_in_order(self):
+        recipe_id = self.add_recipes(recipe_row('Porridge', ['oats', 'milk'], dietary_tags=['breakfast']))['Porridge']
+        with database.get_db_connection() as conn:
+            conn.execute(
+                'UPDATE recipes SET ingredients = ?, dietary_tags = ? WHERE id = ?',
+                ('["milk", "honey", "oats"]', '["sweet", "breakfast"]', recipe_id)
+            )
+
+        found, = database.search_recipes_by_ingredients(['honey'])
+        self.assertEqual(found['ingredients'], ['milk', 'honey', 'oats'])
+        self.assertEqual(found['dietary_tags'], ['sweet', 'breakfast'])
+
+
+class FilteredSearchTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        rows = [
+            recipe_row(
+                f'Bean Dish {n}', ['testbean', 'salt'],
+                cuisine_type='italian' if n % 3 == 0 else 'mexican',
+                difficulty_level=1 + n % 5,
+                cook_time_minutes=20 + 5 * n
+            )
+            for n in range(12)
+        ]
+        rows.append(recipe_row('Untimed Beans', ['testbean'], cuisine_type='mexican', cook_time_minutes=None))
+        self.add_recipes(*rows)
+
+    def search(self, limit, **filters):
+        return database.search_recipes_by_ingredients(['testbean'], limit=limit, **filters)
+
+    def test_filters_apply_before_limit(self):
+        results = self.search(5, cuisine_type='mexican')
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(recipe['cuisine_type'] == 'mexican' for recipe in results))
+
+        results = self.search(3, max_cook_time=40)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(recipe['cook_time_minutes'] <= 40 for recipe in results))
+
+    def test_combined_filters_return_only_matching_rows(self):
+        names = {recipe['name'] for recipe in self.search(10, cuisine_type='mexican', max_cook_time=40, difficulty=3)}
+        self.assertEqual(names, {'Bean Dish 2'})
+
+        names = {recipe['name'] for recipe in self.search(20, cuisine_type='mexican', difficulty=2)}
+        self.assertEqual(names, {'Bean Dish 1', 'Bean Dish 11'})
+
+    def test_missing_cook_time_counts_as_long(self):
+        names = {recipe['name'] for recipe in self.search(20, cuisine_type='mexican', max_cook_time=98)}
+        self.assertNotIn('Untimed Beans', names)
+        names = {recipe['name'] for recipe in self.search(20, cuisine_type='mexican', max_cook_time=99)}
+        self.assertIn('Untimed Beans', names)
+
+    def test_every_filter_combination_matches_python_filter(self):
+        everything = self.search(100)
+        filters = {'cuisine_type': 'mexican', 'max_cook_time': 50, 'difficulty': 4}
+        for mask in range(1, 8):
+            active = {name: value for bit, (name, value) in enumerate(filters.items()) if mask >> bit & 1}
+            expected = [
+                recipe['id'] for recipe in everything
+                if recipe['cuisine_type'] == active.get('cuisine_type', recipe['cuisine_type'])
+                and (recipe['cook_time_minutes'] or 99) <= active.get('max_cook_time', 99)
+                and recipe['difficulty_level'] == active.get('difficulty', recipe['difficulty_level'])
+            ]
+            with self.subTest(filters=active):
+                self.assertEqual(sorted(recipe['id'] for recipe in self.search(100, **active)), sorted(expected))
+
+    def test_filtered_models_are_list_view_recipes(self):
+        models = database.search_recipe_models(['testbean'], limit=2, cuisine_type='italian')
+        self.assertEqual(len(models), 2)
+        self.assertTrue(all(model.cuisine_type == 'italian' and model.ingredients for model in models))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+Tests for recipe scoring, ranking and search analytics
+"""
+
+import sqlite3
+import unittest
+from unittest import mock
+
+import orjson
+
+from recipe_recommender.backend.services import recipe_service
+from recipe_recommender.backend.services.recipe_service import RecipeService, _norm_token
+from tests.test_database import DatabaseTestCase
+
+
+def recipe(name, ingredients, cuisine_type='global', **fields):
+    return dict(name=name, ingredients=ingredients, cuisine_type=cuisine_type, **fields)
+
+
+class NormTokenTest(unittest.TestCase):
+    def test_variants_share_one_canonical_form(self):
+        for text in ('Bell-Pepper', 'bell  pepper', 'The bell pepper', ' BELL_PEPPER '):
+            with self.subTest(text=text):
+                self.assertEqual(_norm_token(text), 'bell pepper')
+
+    def test_single_word_article_is_kept(self):
+        self.assertEqual(_norm_token('A'), 'a')
+        self.assertEqual(_norm_token('tomatoes!'), 'tomatoes')
+
+
+class ScoreRecipesTest(unittest.TestCase):
+    def setUp(self):
+        self.service = RecipeService()
+
+    def test_ingredient_overlap_is_canonicalized(self):
+        scored = self.service.score_recipes(
+            [], [recipe('Salad', ['Bell-Pepper', 'the Onion', 'bell pepper', 'salt'])], ['bell pepper', 'ONION']
+        )
+        self.assertEqual(scored[0]['score'], 2)
+
+    def test_json_and_comma_ingredient_strings_are_scored(self):
+        scored = self.service.score_recipes(
+            [], [recipe('A', '["rice", "beans"]'), recipe('B', 'rice,beans,corn')], ['rice', 'beans']
+        )
+        self.assertEqual([r['score'] for r in scored], [2, 2])
+
+    def test_db_recipe_wins_dedupe_and_ai_gets_boost(self):
+        db = [recipe('Ful Medames', ['fava beans'], 'sudanese', popularity_score=3.0)]
+        ai = [
+            recipe('ful-medames', ['fava beans', 'garlic'], 'sudanese', source='ai'),
+            recipe('Ful Medames', ['fava beans'], 'egyptian', source='ai'),
+        ]
+        scored = self.service.score_recipes(ai, db, ['fava beans', 'garlic'])
+
+        self.assertEqual([(r['name'], r['cuisine_type']) for r in scored],
+                         [('Ful Medames', 'sudanese'), ('Ful Medames', 'egyptian')])
+        self.assertEqual(scored[0]['score'], 1)
+        self.assertEqual(scored[1]['score'], 2.5)
+
+
+class RankRecipesTest(unittest.TestCase):
+    def setUp(self):
+        self.service = RecipeService()
+        # (name, score, popularity); equal keys appear in input order
+        self.recipes = [
+            {'name': name, 'score': score, 'popularity_score': popularity}
+            for name, score, popularity in (
+                ('a', 1, 5.0), ('b', 3, 0.0), ('c', 2, 1.0), ('d', 3, 2.0),
+                ('e', 2, 1.0), ('f', 0, 9.0), ('g', 3, 0.0), ('h', 2, 1.0),
+            )
+        ]
+
+    def names(self, recipes):
+        return [r['name'] for r in recipes]
+
+    def test_orders_by_score_then_popularity_keeping_ties_stable(self):
+        self.assertEqual(self.names(self.service.rank_recipes(self.recipes)),
+                         ['d', 'b', 'g', 'c', 'e', 'h', 'a', 'f'])
+
+    def test_limit_selects_the_same_prefix(self):
+        full = self.names(self.service.rank_recipes(self.recipes))
+        for limit in range(len(self.recipes) + 2):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.names(self.service.rank_recipes(self.recipes, limit=limit)), full[:limit])
+
+    def test_combine_and_rank_applies_limit_after_scoring(self):
+        db = [recipe(f'DB {n}', ['rice'] * (n % 3 + 1), popularity_score=n) for n in range(6)]
+        ai = [recipe('AI rice', ['rice'])]
+        top = self.service.combine_and_rank_recipes(ai, db, ['rice'], limit=3)
+
+        self.assertEqual(self.names(top), ['AI rice', 'DB 5', 'DB 4'])
+        self.assertEqual(len(self.service.combine_and_rank_recipes(ai, db, ['rice'])), 7)
+
+    def test_recipes_without_popularity_score_are_rankable(self):
+        # AI suggestions carry no popularity_score; scoring defaults it so the rank key applies
+        db = [recipe('Rice Bowl', ['rice'], popularity_score=0.5)]
+        ai = [recipe('AI Bowl', ['rice'])]
+        ranked = self.service.combine_and_rank_recipes(ai, db, ['rice', 'beans'])
+
+        self.assertEqual(ai[0]['popularity_score'], 0)
+        self.assertEqual(self.names(ranked), ['AI Bowl', 'Rice Bowl'])
+
+        ai[0]['score'] = db[0]['score']
+        self.assertEqual(self.names(self.service.rank_recipes(ai + db, limit=2)), ['Rice Bowl', 'AI Bowl'])
+
+
+
+class SearchLogBufferTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        # Flush explicitly; the background flusher would race the assertions
+        for patcher in (
+            mock.patch.object(recipe_service, '_start_search_log_flusher'),
+            mock.patch.object(recipe_service, '_search_log_buffer', []),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.service = RecipeService()
+
+    def logged(self):
+        with recipe_service.get_read_connection() as conn:
+            return [
+                (orjson.loads(row['ingredients']), row['results_count'])
+                for row in conn.execute('SELECT ingredients, results_count FROM search_logs ORDER BY id')
+            ]
+
+    def test_rows_are_buffered_until_flush(self):
+        self.service.log_search(['rice'], 2)
+        self.service.log_search(['beans'], 0)
+        self.assertEqual(self.logged(), [])
+
+        self.assertEqual(recipe_service.flush_search_logs(), 2)
+        self.assertEqual(self.logged(), [(['rice'], 2), (['beans'], 0)])
+        self.assertEqual(recipe_service.flush_search_logs(), 0)
+
+    def test_failed_flush_requeues_rows_in_order(self):
+        for n in range(3):
+            self.service.log_search([f'item {n}'], n)
+
+        with mock.patch.object(recipe_service, 'get_db_connection', side_effect=sqlite3.OperationalError('locked')):
+            with self.assertRaises(sqlite3.OperationalError):
+                recipe_service.flush_search_logs()
+        self.service.log_search(['item 3'], 3)
+
+        self.assertEqual(recipe_service.flush_search_logs(), 4)
+        self.assertEqual(self.logged(), [([f'item {n}'], n) for n in range(4)])
+
+    def test_size_trigger_flushes_inline(self):
+        with mock.patch.object(recipe_service, 'SEARCH_LOG_FLUSH_EVENTS', 2):
+            self.service.log_search(['rice'], 1)
+            self.assertEqual(self.logged(), [])
+            self.service.log_search(['rice'], 1)
+        self.assertEqual(len(self.logged()), 2)
+
+
+
+class PopularIngredientsTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        rows = [
+            ('["onion", "Tomatoes"]', "datetime('now')"),
+            ('["the onion", "rice"]', "datetime('now')"),
+            ('[5, "TOMATOES", null]', "datetime('now')"),
+            ('["tomatoes"]', "datetime('now')"),
+            ('{"not": "a list"}', "datetime('now')"),
+            ('not json', "datetime('now')"),
+            ('["rice", "rice", "beans"]', "datetime('now', '-40 days')"),
+        ]
+        with recipe_service.get_db_connection() as conn:
+            for ingredients, timestamp in rows:
+                conn.execute(
+                    f'INSERT INTO search_logs (ingredients, results_count, search_timestamp) VALUES (?, 0, {timestamp})',
+                    (ingredients,)
+                )
+        self.service = RecipeService()
+
+    def test_counts_canonical_ingredients_from_recent_logs(self):
+        self.assertEqual(self.service.get_popular_ingredients(), ['tomatoes', 'onion', 'rice'])
+        self.assertEqual(self.service.get_popular_ingredients(limit=1), ['tomatoes'])
+
+    def test_python_fallback_matches_sql_aggregation(self):
+        expected = self.service.get_popular_ingredients()
+        broken_sql = 'SELECT no_such_function(ingredients), 1 FROM search_logs'
+        with mock.patch.object(recipe_service, 'RECENT_INGREDIENT_COUNTS_SQL', broken_sql):
+            self.assertEqual(self.service.get_popular_ingredients(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for request validation in the API blueprints
+"""
+
+import unittest
+from unittest import mock
+
+import orjson
+from flask import Flask
+
+from recipe_recommender.backend.routes.api_routes import api_bp
+from recipe_recommender.backend.routes.pantry_routes import pantry_bp
+from recipe_recommender.backend import database
+from recipe_recommender.backend.services.pantry_service import PantryService
+from tests.test_database import DatabaseTestCase
+
+
+def make_app():
+    """Bare app with the blueprints and a mocked AI service (the full factory needs Gemini and logging setup)"""
+    app = Flask(__name__)
+    app.config['MAX_INGREDIENTS_PER_SEARCH'] = 10
+    app.ai_service = mock.Mock()
+    app.pantry_service = PantryService()
+    app.register_blueprint(api_bp, url_prefix='/api')
+    app.register_blueprint(pantry_bp, url_prefix='/api/pantry')
+    return app
+
+
+class StreamSuggestionsValidationTest(unittest.TestCase):
+    def setUp(self):
+        self.app = make_app()
+        self.app.ai_service.stream_recipe_suggestions.return_value = iter([{'name': 'Ful Medames'}])
+        self.client = self.app.test_client()
+
+    def post(self, **payload):
+        return self.client.post('/api/recipes/suggest/stream', json=dict({'ingredients': ['beans']}, **payload))
+
+    def test_numeric_string_difficulty_is_coerced_and_clamped(self):
+        response = self.post(difficulty='9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([orjson.loads(line) for line in response.data.splitlines()], [{'name': 'Ful Medames'}])
+        self.assertEqual(self.app.ai_service.stream_recipe_suggestions.call_args.kwargs['difficulty'], 5)
+
+    def test_invalid_inputs_are_rejected_before_streaming(self):
+        for payload in (
+            {'difficulty': 'hard'},
+            {'difficulty': None},
+            {'cuisine_preference': 5},
+            {'dietary_restrictions': 'vegan'},
+            {'dietary_restrictions': ['vegan', 1]},
+        ):
+            with self.subTest(payload=payload):
+                response = self.post(**payload)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.get_json())
+        self.app.ai_service.stream_recipe_suggestions.assert_not_called()
+
+
+
+class PantryValidationTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        with database.get_db_connection() as conn:
+            conn.execute("INSERT INTO users (id, session_id) VALUES (1, 's1')")
+        self.client = make_app().test_client()
+
+    def test_missing_or_invalid_ingredient_name_is_a_400(self):
+        for path in ('/api/pantry/add', '/api/pantry/remove'):
+            for payload in ({'user_id': 1}, {'user_id': 1, 'ingredient_name': 5}, {'user_id': 1, 'ingredient_name': '  '}):
+                with self.subTest(path=path, payload=payload):
+                    response = self.client.post(path, json=payload)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.get_json(), {'error': 'Missing or invalid ingredient_name'})
+
+    def test_invalid_user_id_is_a_400(self):
+        for payload in ({'ingredient_name': 'rice'}, {'user_id': 'me', 'ingredient_name': 'rice'}):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.client.post('/api/pantry/add', json=payload).status_code, 400)
+
+    def test_add_and_remove_with_valid_body(self):
+        response = self.client.post('/api/pantry/add', json={'user_id': '1', 'ingredient_name': ' rice ', 'quantity': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['item']['ingredient_name'], 'rice')
+
+        response = self.client.post('/api/pantry/remove', json={'user_id': 1, 'ingredient_name': 'rice'})
+        self.assertEqual(response.get_json(), {'success': True})
+
+
+if __name__ == '__main__':
+    unittest.main()